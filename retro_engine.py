@@ -0,0 +1,282 @@
+import pygame
+import os
+import time
+import csv
+import json
+import atexit
+from collections import OrderedDict, deque
+
+# Shared pieces used by every game module and by the dashboard.
+# A game exposes a Scene subclass; the same scene runs either in its own
+# process (python retro_pong.py) or inside the dashboard's window.
+#
+# run_scene() uses a fixed simulation step: update() always advances the
+# game by exactly Scene.step seconds, as many times as real time demands,
+# and draw() gets an interpolation factor for the time left over. Game
+# speed therefore doesn't depend on the display's refresh rate.
+
+FIXED_STEP = 1 / 60  # seconds of game time per update()
+MAX_FRAME_TIME = 0.25  # longer stalls are dropped instead of caught up
+
+TEXT_CACHE_SIZE = 256  # rendered strings kept before the least recently used is dropped
+
+# Frame timing instrumentation (see FrameStats)
+FRAME_STATS_SIZE = 600  # frames kept in the ring buffer, 10 s at 60 FPS
+FRAME_FIELDS = ("events_ms", "update_ms", "draw_ms", "flip_ms", "frame_ms", "steps")
+OVERLAY_KEY = pygame.K_F3
+OVERLAY_REFRESH = 0.5  # seconds between overlay text updates
+
+class Scene:
+    caption = "Retro Game"
+    step = FIXED_STEP
+    fps = 60  # render rate cap (0 for uncapped); gameplay speed doesn't depend on it
+    
+    def __init__(self):
+        self.running = True
+    
+    def enter(self, surface):
+        pygame.display.set_caption(self.caption)
+    
+    def handle_event(self, event):
+        pass
+    
+    def update(self, dt):
+        # dt is always self.step
+        pass
+    
+    def draw(self, surface, alpha=1.0):
+        # alpha: how far (0..1) real time is between the last update and the next.
+        # Return the rects that changed to have only those sent to the display,
+        # or None to flip the whole surface.
+        pass
+    
+    def invalidate(self):
+        # The surface was drawn over or lost; scenes that only redraw what
+        # changed must repaint everything on the next draw()
+        pass
+
+class TextCache:
+    # Rendered text surfaces keyed by (font, text, color, antialias), shared by
+    # every game. Static labels are rasterised once; changing text such as
+    # scores only costs a render when the value actually changes.
+    def __init__(self, max_size=TEXT_CACHE_SIZE):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def render(self, font, text, antialias, color):
+        key = (font, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+    
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.surfaces)}
+    
+    def clear(self):
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+text_cache = TextCache()
+
+def render_text(font, text, antialias, color):
+    # Drop-in for font.render(text, antialias, color). The surface is shared,
+    # so callers must only blit it, never draw on it.
+    return text_cache.render(font, text, antialias, color)
+
+class FrameStats:
+    # Per-frame timings recorded by run_scene(): event pumping, updates, draw
+    # and display.flip, plus the whole frame including the wait for the next
+    # one. The last FRAME_STATS_SIZE frames are kept for the on-screen overlay;
+    # with a log open, every frame is also written out for offline analysis.
+    def __init__(self, size=FRAME_STATS_SIZE):
+        self.frames = deque(maxlen=size)  # tuples in FRAME_FIELDS order
+        self.count = 0
+        self.show_overlay = False
+        self.log = None
+        self.log_writer = None
+        self.font = None
+        self.overlay_lines = []
+        self.overlay_updated = 0
+    
+    def open_log(self, path):
+        # CSV for *.csv, JSON lines otherwise
+        self.close_log()
+        self.log = open(path, "w", newline="")
+        if path.endswith(".csv"):
+            self.log_writer = csv.writer(self.log)
+            self.log_writer.writerow(("frame",) + FRAME_FIELDS)
+        # One exit handler however many logs are opened
+        atexit.unregister(self.close_log)
+        atexit.register(self.close_log)
+    
+    def close_log(self):
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+            self.log_writer = None
+    
+    def record(self, timings):
+        self.count += 1
+        self.frames.append(timings)
+        
+        if self.log is None:
+            return
+        row = (self.count,) + tuple(round(value, 3) for value in timings)
+        if self.log_writer is not None:
+            self.log_writer.writerow(row)
+        else:
+            self.log.write(json.dumps(dict(zip(("frame",) + FRAME_FIELDS, row))) + "\n")
+    
+    def summary(self):
+        if not self.frames:
+            return None
+        frame_times = sorted(frame[4] for frame in self.frames)
+        
+        def percentile(p):
+            return frame_times[min(len(frame_times) - 1, int(len(frame_times) * p / 100))]
+        
+        return {
+            "fps": 1000 * len(frame_times) / sum(frame_times) if sum(frame_times) else 0,
+            "p50": percentile(50),
+            "p95": percentile(95),
+            "p99": percentile(99),
+            "worst": sorted(self.frames, key=lambda frame: frame[4], reverse=True)[:3],
+        }
+    
+    def draw_overlay(self, surface):
+        # The text is only re-rendered every OVERLAY_REFRESH seconds, and not
+        # through the shared text cache, which it would just churn
+        now = time.perf_counter()
+        if now - self.overlay_updated >= OVERLAY_REFRESH:
+            self.overlay_updated = now
+            self.render_overlay()
+        
+        if not self.overlay_lines:
+            return
+        width = max(line.get_width() for line in self.overlay_lines) + 12
+        height = sum(line.get_height() for line in self.overlay_lines) + 8
+        box = pygame.Surface((width, height), pygame.SRCALPHA)
+        box.fill((0, 0, 0, 180))  # Semi-transparent black
+        y = 4
+        for line in self.overlay_lines:
+            box.blit(line, (6, y))
+            y += line.get_height()
+        surface.blit(box, (4, surface.get_height() - height - 4))
+    
+    def render_overlay(self):
+        summary = self.summary()
+        if summary is None:
+            return
+        if self.font is None:
+            self.font = pygame.font.SysFont('Arial', 16)
+        
+        last = self.frames[-1]
+        text = [
+            f"FPS {summary['fps']:.1f}   frame p50 {summary['p50']:.1f}  p95 {summary['p95']:.1f}  "
+            f"p99 {summary['p99']:.1f} ms",
+            f"last: events {last[0]:.2f}  update {last[1]:.2f} ({last[5]})  draw {last[2]:.2f}  "
+            f"flip {last[3]:.2f} ms",
+        ]
+        for frame in summary["worst"]:
+            text.append(f"worst {frame[4]:.1f} ms: events {frame[0]:.2f}  update {frame[1]:.2f}  "
+                        f"draw {frame[2]:.2f}  flip {frame[3]:.2f}")
+        self.overlay_lines = [self.font.render(line, True, (255, 255, 0)) for line in text]
+
+frame_stats = FrameStats()
+
+def add_frame_stats_args(parser):
+    parser.add_argument("--overlay", action="store_true",
+                        help="show the frame timing overlay (toggle with F3)")
+    parser.add_argument("--telemetry", metavar="FILE",
+                        help="log per-frame timings to FILE (CSV if it ends in .csv, JSON lines otherwise)")
+
+def apply_frame_stats_args(args):
+    frame_stats.show_overlay = args.overlay
+    if args.telemetry:
+        frame_stats.open_log(args.telemetry)
+
+def lerp(previous, current, alpha):
+    # Render position between the last two simulation states
+    return previous + (current - previous) * alpha
+
+def enable_headless():
+    # Simulation without a window: SDL's dummy drivers accept every call and
+    # show nothing. Safe to call after pygame.init(); the display is restarted.
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    if pygame.display.get_init():
+        pygame.display.quit()
+        pygame.display.init()
+
+def run_scene(scene, surface, clock=None, stats=None):
+    # Drive a scene until it finishes. Returns True if the window was closed,
+    # so a host (the dashboard) knows to shut down as well.
+    clock = clock or pygame.time.Clock()
+    stats = stats or frame_stats
+    scene.enter(surface)
+    clock.tick()
+    frame_time = 0
+    accumulator = 0
+    frame_start = time.perf_counter()
+    
+    while scene.running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return True
+            if event.type == pygame.KEYDOWN and event.key == OVERLAY_KEY:
+                stats.show_overlay = not stats.show_overlay
+                scene.invalidate()
+                continue
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                scene.invalidate()
+            scene.handle_event(event)
+        events_done = time.perf_counter()
+        
+        # Run as many fixed steps as the elapsed time covers
+        accumulator += min(frame_time, MAX_FRAME_TIME)
+        steps = 0
+        while accumulator >= scene.step and scene.running:
+            scene.update(scene.step)
+            accumulator -= scene.step
+            steps += 1
+        if not scene.running:
+            break
+        update_done = time.perf_counter()
+        
+        dirty = scene.draw(surface, accumulator / scene.step)
+        draw_done = time.perf_counter()
+        if stats.show_overlay:
+            stats.draw_overlay(surface)
+            # The overlay is drawn over the scene, which must repaint under it
+            dirty = None
+            scene.invalidate()
+        
+        flip_start = time.perf_counter()
+        if dirty is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
+        flip_done = time.perf_counter()
+        
+        clock.tick(scene.fps)
+        frame_end = time.perf_counter()
+        frame_time = frame_end - frame_start
+        
+        stats.record(((events_done - frame_start) * 1000, (update_done - events_done) * 1000,
+                      (draw_done - update_done) * 1000, (flip_done - flip_start) * 1000,
+                      frame_time * 1000, steps))
+        frame_start = frame_end
+    
+    return False
@@ -2,6 +2,14 @@ import pygame
 import sys
 import subprocess
 import os
+import argparse
+
+import retro_pong
+import retro_tetris
+import retro_snake
+import retro_tictactoe
+from retro_engine import run_scene, render_text, add_frame_stats_args, apply_frame_stats_args
+from retro_launcher import WorkerPool, GameSupervisor, DEFAULT_POOL_SIZE, DEFAULT_MAX_INSTANCES
 
 # Initialize pygame
 pygame.init()
@@ -26,6 +34,32 @@ font_large = pygame.font.SysFont('Arial', 48, bold=True)
 font_medium = pygame.font.SysFont('Arial', 32)
 font_small = pygame.font.SysFont('Arial', 24)
 
+# Main loop pacing: fixed frame rate while something animates, otherwise
+# sleep in pygame.event.wait() until an event arrives
+ANIMATION_FPS = 60
+IDLE_TIMEOUT = 1000  # ms; the idle loop still wakes up this often
+HOVER_FADE_TIME = 0.15  # seconds for a button to fade in/out of its hover look
+
+# Game scene registry: every game runs inside the dashboard's own window
+GAME_SCENES = {
+    "pong": retro_pong.PongScene,
+    "tetris": retro_tetris.TetrisScene,
+    "snake": retro_snake.SnakeScene,
+    "tictactoe": retro_tictactoe.TicTacToeScene,
+}
+
+# Run each game in its own interpreter instead (opt-in, see --isolate)
+isolated_launch = False
+# Warm worker processes used for isolated launches (None: cold start per click)
+worker_pool = None
+# Tracks, limits and reaps isolated game processes
+supervisor = GameSupervisor()
+# Where to write the supervisor's per-game records on exit (see --stats-file)
+stats_file = None
+
+# Status line under the buttons, showing the supervisor's view of running games
+STATUS_RECT = pygame.Rect(0, HEIGHT - 36, WIDTH, 36)
+
 class Button:
     def __init__(self, x, y, width, height, color, text, text_color=BLACK, hover_color=None):
         self.rect = pygame.Rect(x, y, width, height)
@@ -34,19 +68,51 @@ class Button:
         self.text_color = text_color
         self.hover_color = hover_color or self.lighten_color(color)
         self.is_hovered = False
+        self.highlight = 0.0  # 0 = normal look, 1 = fully hovered
         
+        # Pre-render both looks once; drawing is then a single blit
+        self.normal_surface = self.render(self.color)
+        self.hover_surface = self.render(self.hover_color)
+    
     def lighten_color(self, color):
         r, g, b = color
         return min(r + 30, 255), min(g + 30, 255), min(b + 30, 255)
         
-    def draw(self, surface):
-        color = self.hover_color if self.is_hovered else self.color
-        pygame.draw.rect(surface, color, self.rect, border_radius=15)
-        pygame.draw.rect(surface, BLACK, self.rect, 3, border_radius=15)
+    def render(self, color):
+        button_surface = pygame.Surface(self.rect.size)
+        button_surface.fill(BLACK)  # Dashboard background behind the rounded corners
+        local_rect = button_surface.get_rect()
+        pygame.draw.rect(button_surface, color, local_rect, border_radius=15)
+        pygame.draw.rect(button_surface, BLACK, local_rect, 3, border_radius=15)
         
         text_surf = font_medium.render(self.text, True, self.text_color)
-        text_rect = text_surf.get_rect(center=self.rect.center)
-        surface.blit(text_surf, text_rect)
+        text_rect = text_surf.get_rect(center=local_rect.center)
+        button_surface.blit(text_surf, text_rect)
+        return button_surface
+    
+    def draw(self, surface):
+        # Returns the area that changed, for pygame.display.update()
+        rect = surface.blit(self.normal_surface, self.rect)
+        if self.highlight > 0:
+            self.hover_surface.set_alpha(int(self.highlight * 255))
+            surface.blit(self.hover_surface, self.rect)
+        return rect
+    
+    def update(self, dt):
+        # Fade towards the hover look (or back); returns True if the button needs repainting
+        target = 1.0 if self.is_hovered else 0.0
+        step = dt / HOVER_FADE_TIME
+        if self.highlight < target:
+            highlight = min(target, self.highlight + step)
+        else:
+            highlight = max(target, self.highlight - step)
+        
+        changed = highlight != self.highlight
+        self.highlight = highlight
+        return changed
+    
+    def is_animating(self):
+        return self.highlight != (1.0 if self.is_hovered else 0.0)
         
     def check_hover(self, pos):
         self.is_hovered = self.rect.collidepoint(pos)
@@ -55,77 +121,177 @@ class Button:
     def is_clicked(self, pos, click):
         return self.rect.collidepoint(pos) and click
 
-def draw_dashboard():
+def create_buttons():
+    # Buttons are built once and kept for the lifetime of the dashboard
+    return [
+        ("pong", Button(WIDTH//2 - 150, 180, 300, 80, RED, "PONG", WHITE)),
+        ("tetris", Button(WIDTH//2 - 150, 280, 300, 80, GREEN, "TETRIS", WHITE)),
+        ("snake", Button(WIDTH//2 - 150, 380, 300, 80, BLUE, "SNAKE", WHITE)),
+        ("tictactoe", Button(WIDTH//2 - 150, 480, 300, 80, YELLOW, "TIC-TAC-TOE", BLACK)),
+    ]
+
+# Title is static, so it is rendered once
+title_surface = font_large.render("RETRO GAME DASHBOARD", True, WHITE)
+title_rect = title_surface.get_rect(center=(WIDTH//2, 80))
+
+def draw_dashboard(buttons):
+    # Full repaint, only needed on the first frame and after the window was covered
     screen.fill(BLACK)
     
     # Draw title
-    title = font_large.render("RETRO GAME DASHBOARD", True, WHITE)
-    title_rect = title.get_rect(center=(WIDTH//2, 80))
-    screen.blit(title, title_rect)
+    screen.blit(title_surface, title_rect)
     
     # Draw game buttons
-    buttons = []
+    for game_name, button in buttons:
+        button.draw(screen)
     
-    # Pong Button
-    pong_button = Button(WIDTH//2 - 150, 180, 300, 80, RED, "PONG", WHITE)
-    pong_button.draw(screen)
-    buttons.append(("pong", pong_button))
+    draw_status()
+
+def draw_status():
+    # Returns the status area, for pygame.display.update()
+    screen.fill(BLACK, STATUS_RECT)
+    if not supervisor.records:
+        return STATUS_RECT
     
-    # Tetris Button
-    tetris_button = Button(WIDTH//2 - 150, 280, 300, 80, GREEN, "TETRIS", WHITE)
-    tetris_button.draw(screen)
-    buttons.append(("tetris", tetris_button))
+    running = supervisor.running()
+    parts = [f"Running: {len(running)}"]
+    last = supervisor.last_finished()
+    if last is not None:
+        summary = f"Last: {last.game_name.upper()} exit {last.exit_status}"
+        if last.cpu_time is not None:
+            summary += f", CPU {last.cpu_time:.1f}s, peak {last.peak_rss_kb // 1024} MB"
+        parts.append(summary)
     
-    # Snake Button
-    snake_button = Button(WIDTH//2 - 150, 380, 300, 80, BLUE, "SNAKE", WHITE)
-    snake_button.draw(screen)
-    buttons.append(("snake", snake_button))
+    status = render_text(font_small, "   ".join(parts), True, WHITE)
+    screen.blit(status, status.get_rect(center=STATUS_RECT.center))
+    return STATUS_RECT
+
+def launch_game_process(game_name):
+    if not supervisor.can_launch(game_name):
+        print(f"{game_name} is already running ({supervisor.max_instances} allowed)")
+        return
     
-    # Tic-tac-toe Button
-    ttt_button = Button(WIDTH//2 - 150, 480, 300, 80, YELLOW, "TIC-TAC-TOE", BLACK)
-    ttt_button.draw(screen)
-    buttons.append(("tictactoe", ttt_button))
+    if worker_pool is not None:
+        process = worker_pool.launch(game_name)
+        if process is not None:
+            supervisor.track(game_name, process)
+        return
     
-    return buttons
-
-def launch_game(game_name):
     game_file = f"retro_{game_name}.py"
     if os.path.exists(game_file):
         try:
-            subprocess.Popen([sys.executable, game_file])
+            supervisor.track(game_name, subprocess.Popen([sys.executable, game_file]))
         except Exception as e:
             print(f"Error launching {game_name}: {e}")
     else:
         print(f"Game file {game_file} not found!")
 
+def launch_game(game_name):
+    # Returns True if the player closed the window while in the game
+    if isolated_launch:
+        launch_game_process(game_name)
+        return False
+    
+    scene_class = GAME_SCENES.get(game_name)
+    if scene_class is None:
+        print(f"Game {game_name} not found!")
+        return False
+    
+    quit_requested = run_scene(scene_class(), screen)
+    
+    # Back on the dashboard
+    pygame.display.set_caption("Retro Game Dashboard")
+    return quit_requested
+
 def main():
     clock = pygame.time.Clock()
+    buttons = create_buttons()
+    full_redraw = True
+    animating = False
+    dirty_rects = []
+    dt = 0
     running = True
     
     while running:
+        if full_redraw:
+            draw_dashboard(buttons)
+            pygame.display.flip()
+            full_redraw = False
+        elif dirty_rects:
+            pygame.display.update(dirty_rects)
+        
+        if animating:
+            dt = clock.tick(ANIMATION_FPS) / 1000.0
+            events = pygame.event.get()
+        else:
+            # Nothing is moving: sleep until something happens
+            events = [pygame.event.wait(IDLE_TIMEOUT)]
+            events.extend(pygame.event.get())
+            clock.tick()  # Don't count the time spent asleep as frame time
+            dt = 0
+        
         mouse_pos = pygame.mouse.get_pos()
         mouse_click = False
         
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
                     mouse_click = True
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                full_redraw = True
         
-        buttons = draw_dashboard()
+        # Only buttons whose look changed get repainted
+        dirty_rects = []
+        
+        # Reap isolated games that exited since the last pass
+        if supervisor.reap():
+            dirty_rects.append(draw_status())
         
         # Check button interactions
         for game_name, button in buttons:
             button.check_hover(mouse_pos)
+            if button.update(dt):
+                dirty_rects.append(button.draw(screen))
             if button.is_clicked(mouse_pos, mouse_click):
-                launch_game(game_name)
+                if launch_game(game_name):
+                    running = False
+                # The game drew over the whole window
+                full_redraw = True
         
-        pygame.display.flip()
-        clock.tick(60)
+        animating = any(button.is_animating() for game_name, button in buttons)
+    
+    if worker_pool is not None:
+        worker_pool.shutdown()
+    if stats_file:
+        supervisor.reap()
+        supervisor.export(stats_file)
     
     pygame.quit()
     sys.exit()
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Retro Game Dashboard")
+    parser.add_argument("--isolate", action="store_true",
+                        help="launch each game in a separate Python process")
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE,
+                        help="warm worker processes kept ready for --isolate (0 to disable)")
+    parser.add_argument("--max-instances", type=int, default=DEFAULT_MAX_INSTANCES,
+                        help="running copies allowed per game with --isolate")
+    parser.add_argument("--stats-file",
+                        help="write per-game CPU time, peak RSS and exit status here on exit "
+                             "(CSV if the name ends in .csv, JSON lines otherwise)")
+    add_frame_stats_args(parser)
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
+    isolated_launch = args.isolate
+    supervisor.max_instances = args.max_instances
+    stats_file = args.stats_file
+    apply_frame_stats_args(args)
+    if isolated_launch and args.pool_size > 0:
+        worker_pool = WorkerPool(args.pool_size)
+        worker_pool.start()
     main()
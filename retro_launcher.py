@@ -0,0 +1,255 @@
+import subprocess
+import sys
+import os
+import threading
+import importlib
+import time
+import csv
+import json
+
+# Process-isolated game launching for the dashboard (--isolate).
+# Instead of a cold "python retro_pong.py" per click, the dashboard keeps a
+# pool of warm workers: processes that have already imported pygame and all
+# four game modules (which also loads their fonts) and are just waiting to
+# be told which game to run. GameSupervisor keeps track of the games that
+# were launched: it enforces a per-game instance limit, reaps them when they
+# exit and records their CPU time, peak memory and exit status.
+
+GAME_MODULES = {
+    "pong": "retro_pong",
+    "tetris": "retro_tetris",
+    "snake": "retro_snake",
+    "tictactoe": "retro_tictactoe",
+}
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_MAX_INSTANCES = 1  # running copies allowed per game
+REFILL_INTERVAL = 1.0  # seconds between background reap/refill passes
+RETIRE_TIMEOUT = 2.0  # seconds shutdown waits for retired workers to exit
+
+class WorkerPool:
+    def __init__(self, size=DEFAULT_POOL_SIZE):
+        self.size = size
+        self.idle = []  # warm workers waiting for a game
+        self.retired = []  # workers told to exit that haven't been reaped yet
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopped = False
+        self.thread = threading.Thread(target=self.maintain, name="worker-pool", daemon=True)
+    
+    def start(self):
+        self.thread.start()
+        self.wakeup.set()
+    
+    def spawn_worker(self):
+        return subprocess.Popen([sys.executable, os.path.abspath(__file__), "--worker"],
+                                stdin=subprocess.PIPE, text=True)
+    
+    def maintain(self):
+        # Background thread: drop dead workers and top the pool back up.
+        # Workers that were handed a game belong to the GameSupervisor.
+        while not self.stopped:
+            with self.lock:
+                # poll() also reaps the workers that have exited
+                self.idle = [proc for proc in self.idle if proc.poll() is None]
+                self.retired = [proc for proc in self.retired if proc.poll() is None]
+                missing = self.size - len(self.idle)
+            
+            # Spawn outside the lock so a click never waits on process creation
+            for _ in range(missing):
+                try:
+                    worker = self.spawn_worker()
+                except OSError as e:
+                    print(f"Error starting game worker: {e}")
+                    break
+                with self.lock:
+                    stopped = self.stopped
+                    if not stopped:
+                        self.idle.append(worker)
+                if stopped:
+                    # Shut down while we were spawning
+                    self.wait_retired([worker])
+                    return
+            
+            self.wakeup.wait(REFILL_INTERVAL)
+            self.wakeup.clear()
+    
+    def launch(self, game_name):
+        if game_name not in GAME_MODULES:
+            print(f"Game {game_name} not found!")
+            return None
+        
+        while True:
+            with self.lock:
+                worker = self.idle.pop(0) if self.idle else None
+            if worker is None:
+                # Pool is empty (or still warming up): fall back to a cold worker
+                try:
+                    worker = self.spawn_worker()
+                except OSError as e:
+                    print(f"Error launching {game_name}: {e}")
+                    return None
+            
+            try:
+                worker.stdin.write(game_name + "\n")
+                worker.stdin.close()
+            except (BrokenPipeError, OSError):
+                # Worker died while idle; try the next one
+                with self.lock:
+                    self.retire(worker)
+                continue
+            break
+        
+        self.wakeup.set()
+        return worker
+    
+    def retire(self, worker):
+        # Closing stdin tells an idle worker to exit; maintain() reaps it
+        # later. Call with the lock held.
+        try:
+            worker.stdin.close()
+        except OSError:
+            pass
+        self.retired.append(worker)
+    
+    def wait_retired(self, workers):
+        # Reap retired workers so none is left behind as a zombie
+        for worker in workers:
+            try:
+                worker.stdin.close()
+            except OSError:
+                pass
+            try:
+                worker.wait(RETIRE_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                print(f"Game worker {worker.pid} did not exit")
+    
+    def shutdown(self):
+        # Idle workers exit; games that are already running are left alone
+        with self.lock:
+            self.stopped = True
+            for worker in self.idle:
+                self.retire(worker)
+            self.idle = []
+            retired, self.retired = self.retired, []
+        self.wakeup.set()
+        self.wait_retired(retired)
+
+class ChildRecord:
+    def __init__(self, game_name, process):
+        self.game_name = game_name
+        self.process = process
+        self.pid = process.pid
+        self.started = time.time()
+        self.ended = None
+        self.exit_status = None
+        self.cpu_time = None     # seconds, user + system
+        self.peak_rss_kb = None
+    
+    @property
+    def running(self):
+        return self.ended is None
+    
+    def finish(self, exit_status, cpu_time=None, peak_rss_kb=None):
+        self.ended = time.time()
+        self.exit_status = exit_status
+        self.cpu_time = cpu_time
+        self.peak_rss_kb = peak_rss_kb
+    
+    def as_dict(self):
+        return {
+            "game": self.game_name,
+            "pid": self.pid,
+            "started": round(self.started, 3),
+            "ended": round(self.ended, 3) if self.ended is not None else None,
+            "exit_status": self.exit_status,
+            "cpu_time": round(self.cpu_time, 3) if self.cpu_time is not None else None,
+            "peak_rss_kb": self.peak_rss_kb,
+        }
+
+class GameSupervisor:
+    def __init__(self, max_instances=DEFAULT_MAX_INSTANCES):
+        self.max_instances = max_instances
+        self.records = []  # every game launched this session, oldest first
+    
+    def running(self, game_name=None):
+        return [record for record in self.records
+                if record.running and (game_name is None or record.game_name == game_name)]
+    
+    def can_launch(self, game_name):
+        self.reap()
+        return len(self.running(game_name)) < self.max_instances
+    
+    def track(self, game_name, process):
+        record = ChildRecord(game_name, process)
+        self.records.append(record)
+        return record
+    
+    def reap(self):
+        # Collect exited games; returns True if any finished since the last call
+        finished = False
+        for record in self.running():
+            if self.collect(record):
+                finished = True
+        return finished
+    
+    def collect(self, record):
+        if not hasattr(os, "wait4"):
+            # No rusage on this platform: exit status only
+            exit_status = record.process.poll()
+            if exit_status is None:
+                return False
+            record.finish(exit_status)
+            return True
+        
+        try:
+            pid, status, usage = os.wait4(record.pid, os.WNOHANG)
+        except ChildProcessError:
+            # Already reaped elsewhere, resource usage is lost
+            record.finish(record.process.poll())
+            return True
+        if pid == 0:
+            return False
+        
+        exit_status = os.waitstatus_to_exitcode(status)
+        record.process.returncode = exit_status  # So Popen doesn't wait on it again
+        
+        peak_rss = usage.ru_maxrss
+        if sys.platform == "darwin":
+            peak_rss //= 1024  # macOS reports bytes, Linux kilobytes
+        record.finish(exit_status, usage.ru_utime + usage.ru_stime, peak_rss)
+        return True
+    
+    def last_finished(self):
+        finished = [record for record in self.records if not record.running]
+        return finished[-1] if finished else None
+    
+    def export(self, path):
+        # CSV for *.csv, JSON lines otherwise
+        rows = [record.as_dict() for record in self.records]
+        with open(path, "w", newline="") as f:
+            if path.endswith(".csv"):
+                writer = csv.DictWriter(f, fieldnames=["game", "pid", "started", "ended",
+                                                       "exit_status", "cpu_time", "peak_rss_kb"])
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                for row in rows:
+                    f.write(json.dumps(row) + "\n")
+
+def worker_main():
+    # Warm up: everything a game needs is imported before we are asked for one
+    games = {name: importlib.import_module(module) for name, module in GAME_MODULES.items()}
+    
+    game_name = sys.stdin.readline().strip()
+    if game_name not in games:
+        # The dashboard retired us (or sent something we don't know)
+        return
+    
+    games[game_name].main()
+
+if __name__ == "__main__":
+    if "--worker" in sys.argv[1:]:
+        worker_main()
+    else:
+        print("retro_launcher.py is started by retro_game_dashboard.py --isolate")
@@ -1,14 +1,20 @@
 import pygame
 import sys
 import random
+import time
+import argparse
+import json
+import zlib
+
+from retro_engine import (Scene, run_scene, render_text, enable_headless, lerp,
+                          add_frame_stats_args, apply_frame_stats_args)
 
 # Initialize pygame
 pygame.init()
 
 # Screen dimensions
 WIDTH, HEIGHT = 800, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Retro Pong")
+screen = None  # Set by init_display() or by the host running PongScene
 
 # Colors
 BLACK = (0, 0, 0)
@@ -19,13 +25,28 @@ RED = (255, 50, 50)
 DARK_GRAY = (40, 40, 40)
 LIGHT_GRAY = (150, 150, 150)
 
-# Game objects
+# Game objects (speeds are pixels per simulation step, 60 steps a second)
 PADDLE_WIDTH = 15
 PADDLE_HEIGHT = 100
 BALL_SIZE = 15
 BALL_SPEED_X = 7
 BALL_SPEED_Y = 7
 PADDLE_SPEED = 8
+MAX_BALL_SPEED_Y = 10
+MAX_BOUNCES = 4  # collisions the ball resolves within one step
+WINNING_SCORE = 5
+AI_ERROR_RATE = 0.05  # chance per tick that the classic AI freezes
+MAX_MATCH_TICKS = 60 * 60 * 10  # headless safety net: ten minutes of play
+REPLAY_CHECKSUM_INTERVAL = 60  # steps between state checksums in a match log
+
+# Predictive AI difficulty: (prediction error in pixels, standard deviation;
+# reaction delay in simulation steps)
+AI_DIFFICULTY = {
+    "easy": (70, 18),
+    "medium": (25, 6),  # about as strong as the classic ai_movement
+    "hard": (10, 3),
+}
+DEFAULT_AI_DIFFICULTY = "medium"
 
 # Fonts
 font = pygame.font.SysFont('Arial', 32)
@@ -36,11 +57,13 @@ font_small = pygame.font.SysFont('Arial', 20)
 class Paddle:
     def __init__(self, x, y, is_player=False):
         self.rect = pygame.Rect(x, y, PADDLE_WIDTH, PADDLE_HEIGHT)
+        self.prev_y = self.rect.y  # position before the last move, for interpolation
         self.speed = 0
         self.score = 0
         self.is_player = is_player
     
     def move(self):
+        self.prev_y = self.rect.y
         self.rect.y += self.speed
         # Keep paddle on screen
         if self.rect.top < 0:
@@ -48,100 +71,465 @@ class Paddle:
         if self.rect.bottom > HEIGHT:
             self.rect.bottom = HEIGHT
     
-    def draw(self):
+    def draw(self, alpha=1.0):
+        rect = self.rect.copy()
+        rect.y = round(lerp(self.prev_y, self.rect.y, alpha))
+        
         color = BLUE if self.is_player else RED
-        pygame.draw.rect(screen, color, self.rect)
+        pygame.draw.rect(screen, color, rect)
         # Add a 3D effect with a border
-        pygame.draw.rect(screen, WHITE, self.rect, 2)
+        pygame.draw.rect(screen, WHITE, rect, 2)
+        return rect
+
+def axis_times(pos, speed, low, high):
+    # When a ball moving along one axis starts and stops overlapping [low, high),
+    # in fractions of a step
+    if speed == 0:
+        if pos + BALL_SIZE > low and pos < high:
+            return float('-inf'), float('inf')
+        return float('inf'), float('-inf')
+    
+    t1 = (low - (pos + BALL_SIZE)) / speed
+    t2 = (high - pos) / speed
+    return min(t1, t2), max(t1, t2)
+
+def sweep_ball(x, y, speed_x, speed_y, rect):
+    # Swept AABB test of the ball against a static rect. Returns the time of
+    # impact (fraction of the step) or None, and whether the ball hit one of
+    # the rect's sides rather than its top or bottom.
+    entry_x, exit_x = axis_times(x, speed_x, rect.left, rect.right)
+    entry_y, exit_y = axis_times(y, speed_y, rect.top, rect.bottom)
+    entry = max(entry_x, entry_y)
+    if entry < 0 or entry >= min(exit_x, exit_y):
+        # Missed, moving away, or already inside (never sticks to a paddle)
+        return None, False
+    return entry, entry_x >= entry_y
 
 class Ball:
-    def __init__(self):
+    def __init__(self, rng=None):
+        # Every random decision of a match (serves, spin, AI mistakes) is drawn
+        # from this generator, so a seeded one makes the match reproducible
+        self.rng = rng if rng is not None else random.Random()
+        # Bumped whenever the ball's path changes (serve or bounce), so
+        # predictions made for the current path can be reused until then
+        self.trajectory_id = 0
         self.reset()
     
     def reset(self):
         self.rect = pygame.Rect(WIDTH // 2 - BALL_SIZE // 2, HEIGHT // 2 - BALL_SIZE // 2, BALL_SIZE, BALL_SIZE)
-        self.speed_x = BALL_SPEED_X * random.choice([-1, 1])
-        self.speed_y = BALL_SPEED_Y * random.choice([-1, 1])
+        # Exact position; rect is this rounded to pixels
+        self.x = float(self.rect.x)
+        self.y = float(self.rect.y)
+        self.speed_x = BALL_SPEED_X * self.rng.choice([-1, 1])
+        self.speed_y = BALL_SPEED_Y * self.rng.choice([-1, 1])
+        # Position before the last move, for interpolation (none across a reset)
+        self.prev_pos = (self.x, self.y)
+        self.trajectory_id += 1
+    
+    def next_collision(self, remaining, paddles):
+        # Earliest wall, goal line or paddle the ball reaches within the
+        # remaining part of the step: (time, what, paddle side hit)
+        hit_time, hit, side_hit = remaining, None, False
+        
+        # Top and bottom walls
+        if self.speed_y < 0:
+            time_to_wall = -self.y / self.speed_y
+        elif self.speed_y > 0:
+            time_to_wall = (HEIGHT - BALL_SIZE - self.y) / self.speed_y
+        else:
+            time_to_wall = None
+        if time_to_wall is not None and time_to_wall <= hit_time:
+            hit_time, hit = max(0.0, time_to_wall), "wall"
+        
+        # Goal lines
+        if self.speed_x < 0:
+            time_to_goal, goal = -self.x / self.speed_x, "left_goal"
+        else:
+            time_to_goal, goal = (WIDTH - BALL_SIZE - self.x) / self.speed_x, "right_goal"
+        if time_to_goal <= hit_time:
+            hit_time, hit = max(0.0, time_to_goal), goal
+        
+        # Paddles
+        for paddle in paddles:
+            time_to_paddle, side = sweep_ball(self.x, self.y, self.speed_x, self.speed_y, paddle.rect)
+            if time_to_paddle is not None and time_to_paddle <= hit_time:
+                hit_time, hit, side_hit = time_to_paddle, "paddle", side
+        
+        return hit_time, hit, side_hit
+    
+    def resolve_overlap(self, paddles):
+        # A paddle that moved into the ball hits it: sweep_ball only finds
+        # hits on the way in, so push the ball out in front of the paddle's
+        # face and send it back into the court
+        for paddle in paddles:
+            rect = paddle.rect
+            if not (self.x < rect.right and self.x + BALL_SIZE > rect.left and
+                    self.y < rect.bottom and self.y + BALL_SIZE > rect.top):
+                continue
+            if rect.centerx < WIDTH // 2:
+                self.x = float(rect.right)
+                self.speed_x = abs(self.speed_x)
+            else:
+                self.x = float(rect.left - BALL_SIZE)
+                self.speed_x = -abs(self.speed_x)
+            self.add_spin()
+            self.trajectory_id += 1
+    
+    def add_spin(self):
+        # Add some randomness to a paddle bounce
+        self.speed_y += self.rng.uniform(-1, 1)
+        self.speed_y = max(-MAX_BALL_SPEED_Y, min(MAX_BALL_SPEED_Y, self.speed_y))
     
     def move(self, player_paddle, ai_paddle):
-        self.rect.x += self.speed_x
-        self.rect.y += self.speed_y
+        # Swept collision: follow the ball's path through the whole step and
+        # bounce at the exact time of impact, so a fast ball can't tunnel
+        # through a paddle and several bounces can happen in one step
+        self.prev_pos = (self.x, self.y)
+        self.resolve_overlap((player_paddle, ai_paddle))
+        
+        # Broad phase: most steps touch nothing, so skip the sweep for them
+        new_x = self.x + self.speed_x
+        new_y = self.y + self.speed_y
+        swept_area = pygame.Rect(int(min(self.x, new_x)) - 1, int(min(self.y, new_y)) - 1,
+                                 int(abs(self.speed_x)) + BALL_SIZE + 3, int(abs(self.speed_y)) + BALL_SIZE + 3)
+        if 0 < new_y < HEIGHT - BALL_SIZE and 0 < new_x < WIDTH - BALL_SIZE and \
+           swept_area.collidelist((player_paddle.rect, ai_paddle.rect)) == -1:
+            self.x, self.y = new_x, new_y
+            self.rect.x = round(self.x)
+            self.rect.y = round(self.y)
+            return
+        
+        remaining = 1.0  # fraction of the step still to travel
         
-        # Bounce off top and bottom
-        if self.rect.top <= 0 or self.rect.bottom >= HEIGHT:
-            self.speed_y *= -1
+        for _ in range(MAX_BOUNCES + 1):
+            hit_time, hit, side_hit = self.next_collision(remaining, (player_paddle, ai_paddle))
+            self.x += self.speed_x * hit_time
+            self.y += self.speed_y * hit_time
+            remaining -= hit_time
+            
+            if hit is None:
+                break
+            self.trajectory_id += 1
+            
+            # Score points
+            if hit == "left_goal":
+                ai_paddle.score += 1
+                self.reset()
+                return
+            if hit == "right_goal":
+                player_paddle.score += 1
+                self.reset()
+                return
+            
+            if hit == "wall" or not side_hit:
+                # Bounce off top and bottom (of the court or of a paddle)
+                self.speed_y *= -1
+            else:
+                self.speed_x *= -1
+                self.add_spin()
         
-        # Score points
-        if self.rect.left <= 0:
-            ai_paddle.score += 1
-            self.reset()
-        if self.rect.right >= WIDTH:
-            player_paddle.score += 1
-            self.reset()
+        self.rect.x = round(self.x)
+        self.rect.y = round(self.y)
+    
+    def draw(self, alpha=1.0):
+        rect = self.rect.copy()
+        rect.x = round(lerp(self.prev_pos[0], self.x, alpha))
+        rect.y = round(lerp(self.prev_pos[1], self.y, alpha))
         
-        # Paddle collisions
-        if self.rect.colliderect(player_paddle.rect) or self.rect.colliderect(ai_paddle.rect):
-            self.speed_x *= -1
-            # Add some randomness to bounce
-            self.speed_y += random.uniform(-1, 1)
-            if abs(self.speed_y) > 10:
-                self.speed_y = 10 if self.speed_y > 0 else -10
-    
-    def draw(self):
         # Draw ball with a gradient effect
-        pygame.draw.ellipse(screen, WHITE, self.rect)
+        pygame.draw.ellipse(screen, WHITE, rect)
         # Add a small highlight
-        highlight = pygame.Rect(self.rect.x + 2, self.rect.y + 2, BALL_SIZE // 3, BALL_SIZE // 3)
+        highlight = pygame.Rect(rect.x + 2, rect.y + 2, BALL_SIZE // 3, BALL_SIZE // 3)
         pygame.draw.ellipse(screen, (255, 255, 200), highlight)
+        return rect
 
-def draw_game(player_paddle, ai_paddle, ball):
-    # Draw background with a gradient effect
-    screen.fill(BLACK)
+class Court:
+    # The static court (background, centre line and circle, side labels) is
+    # rendered once, and the scores are drawn into a copy of it whenever they
+    # change. Each frame only the areas the paddles and ball covered last
+    # frame are restored from that background and the sprites drawn again;
+    # draw() returns just those rects for display.update().
+    def __init__(self, labels=("PLAYER", "AI")):
+        self.labels = labels
+        self.court = None       # markings and labels only
+        self.background = None  # court plus the current scores
+        self.full_redraw = True
+        self.sprite_rects = []  # where the paddles and ball were drawn last frame
+        self.scores = None
+        self.score_rects = []
     
-    # Draw court markings
-    # Center line
-    pygame.draw.aaline(screen, LIGHT_GRAY, (WIDTH // 2, 0), (WIDTH // 2, HEIGHT))
-    
-    # Center circle
-    pygame.draw.circle(screen, LIGHT_GRAY, (WIDTH // 2, HEIGHT // 2), 50, 1)
-    
-    # Draw player side label
-    player_label = font_small.render("PLAYER", True, BLUE)
-    screen.blit(player_label, (WIDTH // 4 - player_label.get_width() // 2, HEIGHT - 30))
+    def render_court(self):
+        court = pygame.Surface((WIDTH, HEIGHT))
+        if pygame.display.get_surface() is not None:
+            court = court.convert()
+        court.fill(BLACK)
+        
+        # Draw court markings
+        # Center line
+        pygame.draw.aaline(court, LIGHT_GRAY, (WIDTH // 2, 0), (WIDTH // 2, HEIGHT))
+        
+        # Center circle
+        pygame.draw.circle(court, LIGHT_GRAY, (WIDTH // 2, HEIGHT // 2), 50, 1)
+        
+        # Draw player side label
+        player_label = render_text(font_small, self.labels[0], True, BLUE)
+        court.blit(player_label, (WIDTH // 4 - player_label.get_width() // 2, HEIGHT - 30))
+        
+        # Draw AI side label
+        ai_label = render_text(font_small, self.labels[1], True, RED)
+        court.blit(ai_label, (3 * WIDTH // 4 - ai_label.get_width() // 2, HEIGHT - 30))
+        return court
     
-    # Draw AI side label
-    ai_label = font_small.render("AI", True, RED)
-    screen.blit(ai_label, (3 * WIDTH // 4 - ai_label.get_width() // 2, HEIGHT - 30))
+    def invalidate(self):
+        self.full_redraw = True
     
-    # Draw paddles and ball
-    player_paddle.draw()
-    ai_paddle.draw()
-    ball.draw()
+    def update_scores(self, scores):
+        # Redraw changed scores into the background; returns the rects touched
+        changed = []
+        for i, (color, x) in enumerate(((BLUE, WIDTH // 4), (RED, 3 * WIDTH // 4))):
+            if self.scores is not None and scores[i] == self.scores[i]:
+                continue
+            if self.scores is not None:
+                old_rect = self.score_rects[i]
+                self.background.blit(self.court, old_rect, old_rect)
+                changed.append(old_rect)
+            text = render_text(font, str(scores[i]), True, color)
+            rect = text.get_rect(topleft=(x, 20))
+            self.background.blit(text, rect)
+            if self.scores is None:
+                self.score_rects.append(rect)
+            else:
+                self.score_rects[i] = rect
+            changed.append(rect)
+        self.scores = scores
+        return changed
     
-    # Draw scores
-    player_score = font.render(str(player_paddle.score), True, BLUE)
-    ai_score = font.render(str(ai_paddle.score), True, RED)
-    screen.blit(player_score, (WIDTH // 4, 20))
-    screen.blit(ai_score, (3 * WIDTH // 4, 20))
+    def draw(self, player_paddle, ai_paddle, ball, alpha=1.0):
+        if self.court is None:
+            self.court = self.render_court()
+            self.background = self.court.copy()
+        changed = self.update_scores((player_paddle.score, ai_paddle.score))
+        
+        if self.full_redraw:
+            self.full_redraw = False
+            screen.blit(self.background, (0, 0))
+            dirty = [screen.get_rect()]
+        else:
+            # Erase last frame's paddles and ball, and old scores
+            dirty = self.sprite_rects + changed
+            for rect in dirty:
+                screen.blit(self.background, rect, rect)
+        
+        # Draw paddles and ball
+        self.sprite_rects = [player_paddle.draw(alpha), ai_paddle.draw(alpha), ball.draw(alpha)]
+        return dirty + self.sprite_rects
 
-def ai_movement(ai_paddle, ball):
+def ai_movement(ai_paddle, ball, error_rate=AI_ERROR_RATE, speed=PADDLE_SPEED):
     # Simple AI: follow the ball
     if ball.rect.centery < ai_paddle.rect.centery:
-        ai_paddle.speed = -PADDLE_SPEED
+        ai_paddle.speed = -speed
     elif ball.rect.centery > ai_paddle.rect.centery:
-        ai_paddle.speed = PADDLE_SPEED
+        ai_paddle.speed = speed
     else:
         ai_paddle.speed = 0
     
     # Make AI imperfect
-    if random.random() < 0.05:  # 5% chance to make a mistake
+    if ball.rng.random() < error_rate:  # 5% chance to make a mistake by default
         ai_paddle.speed = 0
 
+def predict_intercept(ball, paddle):
+    # Where the ball's centre will be when it reaches the paddle's face,
+    # unfolding bounces off the top and bottom walls. None if the ball is
+    # moving away from the paddle.
+    if ball.speed_x > 0:
+        distance = paddle.rect.left - (ball.x + BALL_SIZE)
+    else:
+        distance = ball.x - paddle.rect.right
+    if distance < 0 or (ball.speed_x > 0) != (paddle.rect.centerx > ball.x):
+        return None
+    
+    y = ball.y + ball.speed_y * distance / abs(ball.speed_x)
+    
+    # Fold the straight-line position back into the court
+    court = HEIGHT - BALL_SIZE
+    y %= 2 * court
+    if y > court:
+        y = 2 * court - y
+    return y + BALL_SIZE / 2
+
+class PredictiveAI:
+    # Moves to where the ball is going to be instead of where it is. The
+    # intercept is only computed when the ball's path changes (a serve or a
+    # bounce) and cached until the next change, so a tick costs next to
+    # nothing. Difficulty comes from the prediction error and from how many
+    # steps the AI takes to react to a new path.
+    def __init__(self, difficulty=DEFAULT_AI_DIFFICULTY, prediction_error=None, reaction_delay=None,
+                 speed=PADDLE_SPEED):
+        error, delay = AI_DIFFICULTY[difficulty]
+        self.prediction_error = error if prediction_error is None else prediction_error
+        self.reaction_delay = delay if reaction_delay is None else reaction_delay
+        self.speed = speed
+        
+        self.trajectory_id = None  # ball path the pending target was computed for
+        self.direction = None      # ball's x direction when the error was drawn
+        self.error = 0
+        self.target_y = HEIGHT / 2
+        self.pending_target = None
+        self.delay = 0
+    
+    def __call__(self, paddle, ball):
+        if ball.trajectory_id != self.trajectory_id:
+            self.trajectory_id = ball.trajectory_id
+            self.plan(paddle, ball)
+        
+        # Reaction delay: keep following the old target for a while
+        if self.pending_target is not None:
+            if self.delay > 0:
+                self.delay -= 1
+            else:
+                self.target_y = self.pending_target
+                self.pending_target = None
+        
+        # Head for the target, stopping exactly on it
+        offset = int(self.target_y - paddle.rect.centery)
+        paddle.speed = max(-self.speed, min(self.speed, offset))
+    
+    def plan(self, paddle, ball):
+        # A new miss distance for every shot towards us; wall bounces on the
+        # way keep it, so the target doesn't jump around
+        direction = ball.speed_x > 0
+        if direction != self.direction:
+            self.direction = direction
+            self.error = ball.rng.gauss(0, self.prediction_error) if self.prediction_error else 0
+            self.delay = self.reaction_delay
+        
+        intercept = predict_intercept(ball, paddle)
+        if intercept is None:
+            # Ball is going away: drift back to the middle
+            self.pending_target = HEIGHT / 2
+        else:
+            self.pending_target = intercept + self.error
+
+def step_game(player_paddle, ai_paddle, ball, ai=ai_movement):
+    # One tick of play; ai(paddle, ball) steers the right paddle.
+    # Touches no display, so it also runs headless.
+    player_paddle.move()
+    ai(ai_paddle, ball)
+    ai_paddle.move()
+    ball.move(player_paddle, ai_paddle)
+
+def new_match(seed=None):
+    # Paddles and ball in their starting positions, with the match's own
+    # random generator
+    player_paddle = Paddle(50, HEIGHT // 2 - PADDLE_HEIGHT // 2, is_player=True)
+    ai_paddle = Paddle(WIDTH - 50 - PADDLE_WIDTH, HEIGHT // 2 - PADDLE_HEIGHT // 2, is_player=False)
+    ball = Ball(random.Random(seed))
+    return player_paddle, ai_paddle, ball
+
+def match_checksum(player_paddle, ai_paddle, ball):
+    # CRC of the simulation state; floats go through repr, which is exact
+    state = (player_paddle.rect.y, ai_paddle.rect.y, player_paddle.score, ai_paddle.score,
+             ball.x, ball.y, ball.speed_x, ball.speed_y)
+    return zlib.crc32(repr(state).encode())
+
+class MatchLog:
+    # Everything needed to re-run a match against the predictive AI: the
+    # seed, the AI's settings and the left paddle's speed at every step,
+    # run-length encoded as [speed, steps] (a rally is a few dozen runs).
+    # A state checksum every REPLAY_CHECKSUM_INTERVAL steps pins down the
+    # first step where a replay stops matching the original.
+    def __init__(self, seed, prediction_error, reaction_delay):
+        self.seed = seed
+        self.prediction_error = prediction_error
+        self.reaction_delay = reaction_delay
+        self.inputs = []
+        self.checksums = {}  # step number -> match_checksum after that step
+        self.ticks = 0
+        self.score = None
+    
+    def make_ai(self):
+        return PredictiveAI(prediction_error=self.prediction_error, reaction_delay=self.reaction_delay)
+    
+    def record(self, speed):
+        if self.inputs and self.inputs[-1][0] == speed:
+            self.inputs[-1][1] += 1
+        else:
+            self.inputs.append([speed, 1])
+        self.ticks += 1
+    
+    def record_state(self, player_paddle, ai_paddle, ball):
+        # Call after each step
+        if self.ticks % REPLAY_CHECKSUM_INTERVAL == 0:
+            self.checksums[self.ticks] = match_checksum(player_paddle, ai_paddle, ball)
+    
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump({
+                "seed": self.seed,
+                "prediction_error": self.prediction_error,
+                "reaction_delay": self.reaction_delay,
+                "ticks": self.ticks,
+                "score": self.score,
+                "inputs": self.inputs,
+                "checksums": self.checksums,
+            }, f)
+    
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        log = cls(data["seed"], data["prediction_error"], data["reaction_delay"])
+        log.inputs = data["inputs"]
+        log.checksums = {int(tick): checksum for tick, checksum in data["checksums"].items()}
+        log.ticks = data["ticks"]
+        log.score = data["score"]
+        return log
+
+def replay_match(log):
+    # Re-run a logged match headless, as fast as it computes. Returns the
+    # final (left score, right score), the steps replayed and the first step
+    # whose checksum differs from the log (None if the replay is exact).
+    player_paddle, ai_paddle, ball = new_match(log.seed)
+    ai = log.make_ai()
+    
+    tick = 0
+    desync = None
+    for speed, steps in log.inputs:
+        for _ in range(steps):
+            player_paddle.speed = speed
+            step_game(player_paddle, ai_paddle, ball, ai)
+            tick += 1
+            expected = log.checksums.get(tick)
+            if (desync is None and expected is not None and
+                    expected != match_checksum(player_paddle, ai_paddle, ball)):
+                desync = tick
+    return (player_paddle.score, ai_paddle.score), tick, desync
+
+def simulate(matches=100, make_left_ai=None, make_right_ai=None, seed=None):
+    # Headless AI-vs-AI matches: no rendering and no frame pacing. The
+    # make_*_ai factories return a fresh controller per match (the classic
+    # ai_movement by default). With a seed, match i uses seed + i and the
+    # run is reproducible. Returns (left score, right score, ticks) per match.
+    results = []
+    for i in range(matches):
+        player_paddle, ai_paddle, ball = new_match(None if seed is None else seed + i)
+        left_ai = make_left_ai() if make_left_ai else ai_movement
+        right_ai = make_right_ai() if make_right_ai else ai_movement
+        
+        ticks = 0
+        while max(player_paddle.score, ai_paddle.score) < WINNING_SCORE and ticks < MAX_MATCH_TICKS:
+            left_ai(player_paddle, ball)  # The AI plays the left paddle too
+            step_game(player_paddle, ai_paddle, ball, right_ai)
+            ticks += 1
+        
+        results.append((player_paddle.score, ai_paddle.score, ticks))
+    return results
+
 def draw_menu():
     screen.fill(BLACK)
     
     # Draw title
-    title = font_large.render("RETRO PONG", True, WHITE)
+    title = render_text(font_large, "RETRO PONG", True, WHITE)
     title_rect = title.get_rect(center=(WIDTH//2, HEIGHT//4))
     screen.blit(title, title_rect)
     
@@ -154,103 +542,188 @@ def draw_menu():
     ]
     
     for i, line in enumerate(instructions):
-        text = font_medium.render(line, True, WHITE)
+        text = render_text(font_medium, line, True, WHITE)
         text_rect = text.get_rect(center=(WIDTH//2, HEIGHT//2 + i * 50))
         screen.blit(text, text_rect)
 
 def draw_game_over(player_paddle, ai_paddle):
     screen.fill(BLACK)
     
-    if player_paddle.score >= 5:
+    if player_paddle.score >= WINNING_SCORE:
         message = "YOU WIN!"
     else:
         message = "GAME OVER"
     
     # Draw message
-    text = font_large.render(message, True, WHITE)
+    text = render_text(font_large, message, True, WHITE)
     text_rect = text.get_rect(center=(WIDTH//2, HEIGHT//3))
     screen.blit(text, text_rect)
     
     # Draw final score
-    score_text = font_medium.render(f"Final Score: {player_paddle.score} - {ai_paddle.score}", True, WHITE)
+    score_text = render_text(font_medium, f"Final Score: {player_paddle.score} - {ai_paddle.score}", True, WHITE)
     score_rect = score_text.get_rect(center=(WIDTH//2, HEIGHT//2))
     screen.blit(score_text, score_rect)
     
     # Draw instructions
-    restart = font_medium.render("Press SPACE to play again", True, WHITE)
+    restart = render_text(font_medium, "Press SPACE to play again", True, WHITE)
     restart_rect = restart.get_rect(center=(WIDTH//2, HEIGHT//2 + 60))
     screen.blit(restart, restart_rect)
     
-    quit_text = font_medium.render("Press ESC to quit", True, WHITE)
+    quit_text = render_text(font_medium, "Press ESC to quit", True, WHITE)
     quit_rect = quit_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 120))
     screen.blit(quit_text, quit_rect)
 
-def main():
-    clock = pygame.time.Clock()
+def init_display():
+    global screen
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    return screen
+
+class PongScene(Scene):
+    caption = "Retro Pong"
     
-    # Create game objects
-    player_paddle = Paddle(50, HEIGHT // 2 - PADDLE_HEIGHT // 2, is_player=True)
-    ai_paddle = Paddle(WIDTH - 50 - PADDLE_WIDTH, HEIGHT // 2 - PADDLE_HEIGHT // 2, is_player=False)
-    ball = Ball()
+    def __init__(self, difficulty=DEFAULT_AI_DIFFICULTY, record_to=None):
+        super().__init__()
+        self.difficulty = difficulty
+        self.record_to = record_to  # match log written here when a match ends
+        self.court = Court()
+        self.new_match()
+        
+        self.game_state = "menu"  # menu, playing, game_over
     
-    game_state = "menu"  # menu, playing, game_over
+    def new_match(self):
+        # A fresh seed per match; the log records it along with our inputs
+        seed = random.randrange(2 ** 32)
+        self.player_paddle, self.ai_paddle, self.ball = new_match(seed)
+        self.ai = PredictiveAI(self.difficulty)
+        self.log = MatchLog(seed, self.ai.prediction_error, self.ai.reaction_delay)
     
-    running = True
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
+    def end_match(self):
+        self.log.score = [self.player_paddle.score, self.ai_paddle.score]
+        if self.record_to:
+            self.log.save(self.record_to)
+    
+    def enter(self, surface):
+        global screen
+        screen = surface
+        super().enter(surface)
+    
+    def handle_event(self, event):
+        player_paddle = self.player_paddle
+        
+        # Keyboard events
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                if self.game_state == "playing":
+                    self.end_match()
+                self.running = False
             
-            # Keyboard events
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    running = False
-                
-                if game_state == "menu" or game_state == "game_over":
-                    if event.key == pygame.K_SPACE:
-                        game_state = "playing"
-                        player_paddle.score = 0
-                        ai_paddle.score = 0
-                        ball.reset()
-                
-                if game_state == "playing":
-                    if event.key == pygame.K_UP:
-                        player_paddle.speed = -PADDLE_SPEED
-                    if event.key == pygame.K_DOWN:
-                        player_paddle.speed = PADDLE_SPEED
+            if self.game_state == "menu" or self.game_state == "game_over":
+                if event.key == pygame.K_SPACE:
+                    self.game_state = "playing"
+                    self.new_match()
+                    player_paddle = self.player_paddle
             
-            if event.type == pygame.KEYUP:
-                if game_state == "playing":
-                    if event.key == pygame.K_UP and player_paddle.speed < 0:
-                        player_paddle.speed = 0
-                    if event.key == pygame.K_DOWN and player_paddle.speed > 0:
-                        player_paddle.speed = 0
+            if self.game_state == "playing":
+                if event.key == pygame.K_UP:
+                    player_paddle.speed = -PADDLE_SPEED
+                if event.key == pygame.K_DOWN:
+                    player_paddle.speed = PADDLE_SPEED
         
-        if game_state == "menu":
-            draw_menu()
+        if event.type == pygame.KEYUP:
+            if self.game_state == "playing":
+                if event.key == pygame.K_UP and player_paddle.speed < 0:
+                    player_paddle.speed = 0
+                if event.key == pygame.K_DOWN and player_paddle.speed > 0:
+                    player_paddle.speed = 0
+    
+    def update(self, dt):
+        if self.game_state != "playing":
+            return
         
-        elif game_state == "playing":
-            # Update game objects
-            player_paddle.move()
-            ai_movement(ai_paddle, ball)
-            ai_paddle.move()
-            ball.move(player_paddle, ai_paddle)
-            
-            # Draw everything
-            draw_game(player_paddle, ai_paddle, ball)
-            
-            # Check for game over
-            if player_paddle.score >= 5 or ai_paddle.score >= 5:
-                game_state = "game_over"
+        # Update game objects
+        self.log.record(self.player_paddle.speed)
+        step_game(self.player_paddle, self.ai_paddle, self.ball, self.ai)
+        self.log.record_state(self.player_paddle, self.ai_paddle, self.ball)
         
-        elif game_state == "game_over":
-            draw_game_over(player_paddle, ai_paddle)
+        # Check for game over
+        if self.player_paddle.score >= WINNING_SCORE or self.ai_paddle.score >= WINNING_SCORE:
+            self.game_state = "game_over"
+            self.end_match()
+    
+    def invalidate(self):
+        self.court.invalidate()
+    
+    def draw(self, surface, alpha=1.0):
+        if self.game_state == "playing":
+            return self.court.draw(self.player_paddle, self.ai_paddle, self.ball, alpha)
         
-        pygame.display.flip()
-        clock.tick(60)
+        # Menus cover the court, which is repainted in full when play starts
+        self.court.invalidate()
+        if self.game_state == "menu":
+            draw_menu()
+        elif self.game_state == "game_over":
+            draw_game_over(self.player_paddle, self.ai_paddle)
+
+def main(record_to=None):
+    run_scene(PongScene(record_to=record_to), init_display())
     
     pygame.quit()
     sys.exit()
 
+def run_replay(path):
+    log = MatchLog.load(path)
+    start = time.perf_counter()
+    score, ticks, desync = replay_match(log)
+    elapsed = time.perf_counter() - start
+    
+    print(f"Replayed {ticks} steps (seed {log.seed}) in {elapsed:.3f}s, "
+          f"{ticks / 60 / max(elapsed, 1e-9):,.0f}x real time")
+    print(f"Final score {score[0]} - {score[1]}" +
+          (f" (recorded {log.score[0]} - {log.score[1]})" if log.score else ""))
+    if desync is not None:
+        print(f"DESYNC: state first differs from the log at step {desync}")
+    else:
+        print(f"State matches all {len(log.checksums)} recorded checksums")
+
+def run_headless(matches, right_ai="classic", seed=None):
+    make_right_ai = None
+    if right_ai != "classic":
+        make_right_ai = lambda: PredictiveAI(right_ai)
+    
+    start = time.perf_counter()
+    results = simulate(matches, make_right_ai=make_right_ai, seed=seed)
+    elapsed = time.perf_counter() - start
+    
+    ticks = sum(result[2] for result in results)
+    left_wins = sum(1 for result in results if result[0] > result[1])
+    print(f"{matches} matches, left {left_wins} - right {matches - left_wins}")
+    print(f"{ticks} ticks in {elapsed:.2f}s ({ticks / elapsed:,.0f} ticks/s)")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Retro Pong")
+    parser.add_argument("--headless", action="store_true",
+                        help="simulate AI-vs-AI matches without a window and report speed")
+    parser.add_argument("--matches", type=int, default=100,
+                        help="matches to simulate with --headless")
+    parser.add_argument("--right-ai", choices=["classic"] + list(AI_DIFFICULTY), default="classic",
+                        help="right paddle's AI with --headless: the classic ball follower "
+                             "or the predictive AI at a difficulty")
+    parser.add_argument("--seed", type=int, help="random seed for reproducible --headless matches")
+    parser.add_argument("--record", metavar="FILE",
+                        help="save a replay log of each match to FILE when it ends")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="re-simulate a recorded match headless and check it against the log")
+    add_frame_stats_args(parser)
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.replay:
+        enable_headless()
+        run_replay(args.replay)
+    elif args.headless:
+        enable_headless()
+        run_headless(args.matches, args.right_ai, args.seed)
+    else:
+        apply_frame_stats_args(args)
+        main(args.record)
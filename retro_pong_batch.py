@@ -0,0 +1,259 @@
+import numpy as np
+import time
+import argparse
+
+from retro_pong import (WIDTH, HEIGHT, PADDLE_WIDTH, PADDLE_HEIGHT, BALL_SIZE, BALL_SPEED_X, BALL_SPEED_Y,
+                        PADDLE_SPEED, MAX_BALL_SPEED_Y, MAX_BOUNCES, WINNING_SCORE, MAX_MATCH_TICKS,
+                        AI_ERROR_RATE)
+
+# Batched AI-vs-AI Pong: thousands of independent matches advanced together,
+# one NumPy operation per rule instead of one Python call per match.
+# The rules are those of retro_pong's Paddle.move, ai_movement and Ball.move
+# (including its swept collisions), so results are comparable with
+# retro_pong.simulate().
+
+LEFT_PADDLE_X = 50
+RIGHT_PADDLE_X = WIDTH - 50 - PADDLE_WIDTH
+
+def round_like_ball(values):
+    # Ball.move's round(): halves go to the even integer, as np.rint does
+    return np.rint(values).astype(np.int64)
+
+def axis_times(pos, speed, low, high):
+    # retro_pong.axis_times for arrays; high may be an array too
+    moving = speed != 0
+    safe_speed = np.where(moving, speed, 1.0)
+    t1 = (low - (pos + BALL_SIZE)) / safe_speed
+    t2 = (high - pos) / safe_speed
+    overlapping = (pos + BALL_SIZE > low) & (pos < high)
+    entry = np.where(moving, np.minimum(t1, t2), np.where(overlapping, -np.inf, np.inf))
+    exit = np.where(moving, np.maximum(t1, t2), np.where(overlapping, np.inf, -np.inf))
+    return entry, exit
+
+def sweep_ball(x, y, speed_x, speed_y, paddle_x, paddle_y):
+    # retro_pong.sweep_ball for arrays: time of impact (inf for none) and
+    # whether a paddle side was hit
+    entry_x, exit_x = axis_times(x, speed_x, paddle_x, paddle_x + PADDLE_WIDTH)
+    entry_y, exit_y = axis_times(y, speed_y, paddle_y, paddle_y + PADDLE_HEIGHT)
+    entry = np.maximum(entry_x, entry_y)
+    hit = (entry >= 0) & (entry < np.minimum(exit_x, exit_y))
+    return np.where(hit, entry, np.inf), entry_x >= entry_y
+
+class BatchPong:
+    def __init__(self, matches, seed=None, left_error=AI_ERROR_RATE, right_error=AI_ERROR_RATE,
+                 left_speed=PADDLE_SPEED, right_speed=PADDLE_SPEED):
+        # Error rates and paddle speeds may be scalars or one value per match
+        self.matches = matches
+        self.rng = np.random.default_rng(seed)
+        self.left_error = np.broadcast_to(np.asarray(left_error, dtype=float), (matches,))
+        self.right_error = np.broadcast_to(np.asarray(right_error, dtype=float), (matches,))
+        self.left_speed = np.broadcast_to(np.asarray(left_speed, dtype=np.int64), (matches,))
+        self.right_speed = np.broadcast_to(np.asarray(right_speed, dtype=np.int64), (matches,))
+        
+        self.left_y = np.full(matches, HEIGHT // 2 - PADDLE_HEIGHT // 2, dtype=np.int64)
+        self.right_y = self.left_y.copy()
+        self.left_score = np.zeros(matches, dtype=np.int64)
+        self.right_score = np.zeros(matches, dtype=np.int64)
+        
+        self.ball_x = np.zeros(matches, dtype=float)
+        self.ball_y = np.zeros(matches, dtype=float)
+        self.speed_x = np.zeros(matches, dtype=float)
+        self.speed_y = np.zeros(matches, dtype=float)
+        self.reset_balls(np.ones(matches, dtype=bool))
+        
+        self.ticks = np.zeros(matches, dtype=np.int64)  # ticks played per match
+        self.done = np.zeros(matches, dtype=bool)
+        self.hits = np.zeros(matches, dtype=np.int64)  # paddle hits in the current rally
+        self.rally_lengths = []  # arrays of paddle hits per finished rally
+    
+    def reset_balls(self, mask):
+        # Ball.reset for the matches in mask
+        count = int(mask.sum())
+        if not count:
+            return
+        self.ball_x[mask] = WIDTH // 2 - BALL_SIZE // 2
+        self.ball_y[mask] = HEIGHT // 2 - BALL_SIZE // 2
+        self.speed_x[mask] = BALL_SPEED_X * self.rng.choice((-1, 1), count)
+        self.speed_y[mask] = BALL_SPEED_Y * self.rng.choice((-1, 1), count)
+    
+    def ai_speed(self, paddle_y, paddle_speed, error_rate):
+        # ai_movement: follow the ball's centre, freezing now and then
+        ball_center = round_like_ball(self.ball_y) + BALL_SIZE // 2
+        paddle_center = paddle_y + PADDLE_HEIGHT // 2
+        speed = np.sign(ball_center - paddle_center) * paddle_speed
+        speed[self.rng.random(self.matches) < error_rate] = 0
+        return speed
+    
+    def near_paddle(self, x, y, new_x, new_y, paddle_x, paddle_y):
+        # Broad phase: does the area swept by the ball this step touch the paddle?
+        return ((np.minimum(x, new_x) - 1 < paddle_x + PADDLE_WIDTH) &
+                (np.maximum(x, new_x) + BALL_SIZE + 1 > paddle_x) &
+                (np.minimum(y, new_y) - 1 < paddle_y + PADDLE_HEIGHT) &
+                (np.maximum(y, new_y) + BALL_SIZE + 1 > paddle_y))
+    
+    def resolve_overlaps(self, active):
+        # Ball.resolve_overlap: a paddle that moved into the ball hits it,
+        # and the ball is put in front of its face
+        for paddle_x, paddle_y, face_x, direction in (
+                (LEFT_PADDLE_X, self.left_y, LEFT_PADDLE_X + PADDLE_WIDTH, 1),
+                (RIGHT_PADDLE_X, self.right_y, RIGHT_PADDLE_X - BALL_SIZE, -1)):
+            inside = active & (self.ball_x < paddle_x + PADDLE_WIDTH) & (self.ball_x + BALL_SIZE > paddle_x) & \
+                     (self.ball_y < paddle_y + PADDLE_HEIGHT) & (self.ball_y + BALL_SIZE > paddle_y)
+            count = int(inside.sum())
+            if not count:
+                continue
+            self.ball_x[inside] = face_x
+            self.speed_x[inside] = direction * np.abs(self.speed_x[inside])
+            self.speed_y[inside] = np.clip(self.speed_y[inside] + self.rng.uniform(-1, 1, count),
+                                           -MAX_BALL_SPEED_Y, MAX_BALL_SPEED_Y)
+            self.hits += inside
+    
+    def move_balls(self, active):
+        # Ball.move for every active match. Returns who scored.
+        self.resolve_overlaps(active)
+        x, y = self.ball_x, self.ball_y
+        new_x = x + self.speed_x
+        new_y = y + self.speed_y
+        
+        # Broad phase: most balls touch nothing this step and just move
+        sweep = active & ((new_y <= 0) | (new_y >= HEIGHT - BALL_SIZE) |
+                          (new_x <= 0) | (new_x >= WIDTH - BALL_SIZE) |
+                          self.near_paddle(x, y, new_x, new_y, LEFT_PADDLE_X, self.left_y) |
+                          self.near_paddle(x, y, new_x, new_y, RIGHT_PADDLE_X, self.right_y))
+        moving = active & ~sweep
+        self.ball_x = np.where(moving, new_x, x)
+        self.ball_y = np.where(moving, new_y, y)
+        
+        left_point = np.zeros(self.matches, dtype=bool)
+        right_point = np.zeros(self.matches, dtype=bool)
+        indices = np.flatnonzero(sweep)
+        if len(indices):
+            left_point[indices], right_point[indices] = self.sweep_balls(indices)
+        return left_point, right_point
+    
+    def sweep_balls(self, indices):
+        # Narrow phase for the matches in indices: each pass advances the balls
+        # that are still travelling to their next impact and resolves it
+        x, y = self.ball_x[indices], self.ball_y[indices]
+        speed_x, speed_y = self.speed_x[indices], self.speed_y[indices]
+        left_y, right_y = self.left_y[indices], self.right_y[indices]
+        hits = np.zeros(len(indices), dtype=np.int64)
+        
+        remaining = np.ones(len(indices))
+        travelling = np.ones(len(indices), dtype=bool)
+        left_point = np.zeros(len(indices), dtype=bool)
+        right_point = np.zeros(len(indices), dtype=bool)
+        
+        for _ in range(MAX_BOUNCES + 1):
+            # Top and bottom walls, goal lines and paddles
+            with np.errstate(divide='ignore', invalid='ignore'):
+                time_to_wall = np.where(speed_y < 0, -y / speed_y,
+                                        np.where(speed_y > 0, (HEIGHT - BALL_SIZE - y) / speed_y, np.inf))
+            time_to_wall = np.maximum(time_to_wall, 0.0)
+            time_to_goal = np.maximum(np.where(speed_x < 0, -x / speed_x,
+                                               (WIDTH - BALL_SIZE - x) / speed_x), 0.0)
+            time_to_left, left_side = sweep_ball(x, y, speed_x, speed_y, LEFT_PADDLE_X, left_y)
+            time_to_right, right_side = sweep_ball(x, y, speed_x, speed_y, RIGHT_PADDLE_X, right_y)
+            time_to_paddle = np.minimum(time_to_left, time_to_right)
+            
+            # Same precedence as Ball.next_collision on ties: paddle, goal, wall
+            hit_time = np.minimum(np.minimum(time_to_wall, time_to_goal), time_to_paddle)
+            hit = travelling & (hit_time <= remaining)
+            hit_time = np.where(hit, hit_time, np.where(travelling, remaining, 0.0))
+            
+            x = x + speed_x * hit_time
+            y = y + speed_y * hit_time
+            remaining = remaining - hit_time
+            
+            paddle = hit & (time_to_paddle == hit_time)
+            goal = hit & ~paddle & (time_to_goal == hit_time)
+            wall = hit & ~paddle & ~goal
+            side_hit = paddle & np.where(time_to_left <= time_to_right, left_side, right_side)
+            
+            # Score points
+            left_point |= goal & (speed_x > 0)
+            right_point |= goal & (speed_x < 0)
+            
+            speed_y = np.where(wall | (paddle & ~side_hit), -speed_y, speed_y)
+            count = int(side_hit.sum())
+            if count:
+                speed_x = np.where(side_hit, -speed_x, speed_x)
+                # Add some randomness to bounce
+                speed_y[side_hit] = np.clip(speed_y[side_hit] + self.rng.uniform(-1, 1, count),
+                                            -MAX_BALL_SPEED_Y, MAX_BALL_SPEED_Y)
+                hits += side_hit
+            
+            travelling = hit & ~goal
+            if not travelling.any():
+                break
+        
+        self.ball_x[indices], self.ball_y[indices] = x, y
+        self.speed_x[indices], self.speed_y[indices] = speed_x, speed_y
+        self.hits[indices] += hits
+        return left_point, right_point
+    
+    def step(self):
+        # One tick of every unfinished match
+        active = ~self.done
+        
+        # Paddles: the left one moves first, then the right one reacts
+        left_y = np.clip(self.left_y + self.ai_speed(self.left_y, self.left_speed, self.left_error),
+                         0, HEIGHT - PADDLE_HEIGHT)
+        self.left_y = np.where(active, left_y, self.left_y)
+        right_y = np.clip(self.right_y + self.ai_speed(self.right_y, self.right_speed, self.right_error),
+                          0, HEIGHT - PADDLE_HEIGHT)
+        self.right_y = np.where(active, right_y, self.right_y)
+        
+        # Ball movement, bounces and points
+        left_point, right_point = self.move_balls(active)
+        self.left_score += left_point
+        self.right_score += right_point
+        
+        point = right_point | left_point
+        if point.any():
+            self.reset_balls(point)
+            self.rally_lengths.append(self.hits[point])
+            self.hits[point] = 0
+        
+        self.ticks += active
+        self.done |= (np.maximum(self.left_score, self.right_score) >= WINNING_SCORE) | \
+                     (self.ticks >= MAX_MATCH_TICKS)
+    
+    def run(self):
+        # Step until every match is decided; returns the number of batch steps
+        steps = 0
+        while not self.done.all():
+            self.step()
+            steps += 1
+        return steps
+    
+    def rallies(self):
+        # Paddle hits of every finished rally so far, as one array
+        if not self.rally_lengths:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(self.rally_lengths)
+
+def run_benchmark(matches, seed=None):
+    batch = BatchPong(matches, seed)
+    start = time.perf_counter()
+    batch.run()
+    elapsed = time.perf_counter() - start
+    
+    ticks = int(batch.ticks.sum())
+    rallies = batch.rallies()
+    left_wins = int((batch.left_score > batch.right_score).sum())
+    print(f"{matches} matches, left {left_wins} - right {matches - left_wins}")
+    print(f"{ticks} match ticks in {elapsed:.2f}s ({ticks / elapsed:,.0f} ticks/s)")
+    print(f"{len(rallies)} rallies ({len(rallies) / elapsed * 60:,.0f} per minute), "
+          f"mean {rallies.mean():.1f} paddle hits")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Batched headless Pong simulator")
+    parser.add_argument("--matches", type=int, default=10000,
+                        help="matches simulated side by side")
+    parser.add_argument("--seed", type=int, help="random seed for a reproducible run")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    run_benchmark(args.matches, args.seed)
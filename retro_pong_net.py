@@ -0,0 +1,494 @@
+import pygame
+import sys
+import random
+import time
+import argparse
+import asyncio
+import threading
+import struct
+import zlib
+from collections import deque
+
+import retro_pong
+from retro_pong import (WIDTH, HEIGHT, BLACK, WHITE, PADDLE_SPEED, WINNING_SCORE,
+                        new_match, step_game, Court, draw_game_over, init_display,
+                        font_medium, font_small)
+from retro_engine import (Scene, run_scene, render_text, add_frame_stats_args,
+                          apply_frame_stats_args)
+
+# Two-player Pong over UDP with rollback netcode.
+#
+# Both peers run the same deterministic simulation (retro_pong.step_game on
+# a match seeded by the host) and only exchange paddle inputs: -1, 0 or 1 per
+# step. A local input is applied INPUT_DELAY steps after it was pressed,
+# which hides that much latency outright. When the remote input for a step
+# hasn't arrived yet, we predict it (the opponent keeps doing what they did
+# last) and carry on; once the real input arrives and differs, the state is
+# restored from a snapshot and the mispredicted steps are re-simulated.
+#
+# Networking runs on an asyncio event loop in a background thread, so the
+# game itself still goes through run_scene(). Packets carry every input the
+# peer hasn't acknowledged yet, so a lost packet is covered by the next one.
+
+DEFAULT_PORT = 5005
+DEFAULT_INPUT_DELAY = 2  # steps; 33 ms at 60 steps a second
+MAX_INPUT_DELAY = 255    # sent as one byte in WELCOME
+MAX_ROLLBACK = 10        # steps we may run ahead of the last confirmed remote input
+SYNC_INTERVAL = 20       # minimum steps between two time-sync stalls
+CHECKSUM_INTERVAL = 60   # steps between desync checks
+HELLO_INTERVAL = 0.25    # seconds between connection attempts
+PEER_TIMEOUT = 5.0       # seconds of silence before the opponent counts as gone
+
+# Packet types
+HELLO = b"H"
+WELCOME = b"W"
+INPUTS = b"I"
+WELCOME_FORMAT = "!cIB"  # type, seed, input delay
+# type, first input frame, ack, sender frame, sender advantage,
+# checksum frame, checksum; then one signed byte per input
+INPUTS_FORMAT = "!ciiihiI"
+INPUTS_HEADER = struct.calcsize(INPUTS_FORMAT)
+
+def save_state(left, right, ball):
+    return (left.rect.y, left.prev_y, left.speed, left.score,
+            right.rect.y, right.prev_y, right.speed, right.score,
+            ball.x, ball.y, ball.speed_x, ball.speed_y, ball.rect.topleft,
+            ball.prev_pos, ball.trajectory_id, ball.rng.getstate())
+
+def load_state(left, right, ball, state):
+    (left.rect.y, left.prev_y, left.speed, left.score,
+     right.rect.y, right.prev_y, right.speed, right.score,
+     ball.x, ball.y, ball.speed_x, ball.speed_y, ball.rect.topleft,
+     ball.prev_pos, ball.trajectory_id, rng_state) = state
+    ball.rng.setstate(rng_state)
+
+def state_checksum(state):
+    # The generator state is left out; any divergence shows in the ball soon enough
+    return zlib.crc32(repr(state[:-1]).encode())
+
+def remote_control(paddle, ball):
+    # step_game's AI hook: the paddle's speed was already set from its input
+    pass
+
+def net_step(left, right, ball, left_input, right_input):
+    left.speed = left_input * PADDLE_SPEED
+    right.speed = right_input * PADDLE_SPEED
+    step_game(left, right, ball, remote_control)
+
+class RollbackSession:
+    # The match as seen by one peer. side is 0 for the left paddle (host),
+    # 1 for the right one. Knows nothing about sockets: receive() takes a
+    # packet from the opponent and make_packet() builds one for them.
+    def __init__(self, seed, side, input_delay=DEFAULT_INPUT_DELAY):
+        self.left, self.right, self.ball = new_match(seed)
+        self.side = side
+        self.input_delay = input_delay
+        self.frame = 0  # next step to simulate
+        
+        # Nobody can have pressed anything for the first input_delay steps
+        self.local_inputs = {frame: 0 for frame in range(input_delay)}
+        self.remote_inputs = dict(self.local_inputs)
+        self.remote_confirmed = input_delay - 1  # remote inputs known up to here
+        self.peer_ack = -1                       # our inputs the peer has up to here
+        self.used_remote = {}  # frame -> remote input the simulation assumed
+        self.snapshots = {}    # frame -> state before that frame
+        self.rollback_from = None
+        
+        # Time sync
+        self.remote_frame = 0
+        self.remote_advantage = 0
+        self.sync_cooldown = 0
+        
+        # Desync detection
+        self.checksums = {}         # frame -> checksum of our confirmed state
+        self.remote_checksums = {}  # frame -> the opponent's
+        self.latest_checksum = (-1, 0)
+        self.desync_frame = None
+        
+        # Statistics
+        self.rollbacks = 0
+        self.rollback_steps = 0
+        self.stalls = 0
+    
+    @property
+    def paddles(self):
+        # (ours, theirs)
+        return (self.left, self.right) if self.side == 0 else (self.right, self.left)
+    
+    def advantage(self):
+        # How far we are ahead of the opponent, as far as we know
+        return self.frame - self.remote_frame
+    
+    def receive(self, data):
+        (_, first, ack, remote_frame, remote_advantage,
+         checksum_frame, checksum) = struct.unpack_from(INPUTS_FORMAT, data)
+        inputs = struct.unpack_from(f"!{len(data) - INPUTS_HEADER}b", data, INPUTS_HEADER)
+        
+        for frame, value in enumerate(inputs, first):
+            if frame <= self.remote_confirmed or frame in self.remote_inputs:
+                continue
+            self.remote_inputs[frame] = value
+            # Already simulated with a different guess: roll back to there
+            if frame in self.used_remote and self.used_remote[frame] != value:
+                if self.rollback_from is None or frame < self.rollback_from:
+                    self.rollback_from = frame
+        while self.remote_confirmed + 1 in self.remote_inputs:
+            self.remote_confirmed += 1
+        
+        self.peer_ack = max(self.peer_ack, ack)
+        if remote_frame >= self.remote_frame:
+            self.remote_frame = remote_frame
+            self.remote_advantage = remote_advantage
+        if checksum_frame >= 0:
+            self.remote_checksums[checksum_frame] = checksum
+            self.compare_checksum(checksum_frame)
+    
+    def make_packet(self):
+        first = self.peer_ack + 1
+        last = self.frame + self.input_delay - 1  # newest input we have
+        inputs = [self.local_inputs[frame] for frame in range(first, last + 1)]
+        advantage = max(-32768, min(32767, self.advantage()))
+        header = struct.pack(INPUTS_FORMAT, INPUTS, first, self.remote_confirmed, self.frame,
+                             advantage, *self.latest_checksum)
+        return header + struct.pack(f"!{len(inputs)}b", *inputs)
+    
+    def game_over(self):
+        return max(self.left.score, self.right.score) >= WINNING_SCORE
+    
+    def finished(self):
+        # Game over in a state both sides agree on
+        return (self.game_over() and self.rollback_from is None and
+                self.frame - 1 <= self.remote_confirmed)
+    
+    def tick(self, direction):
+        # One fixed step of real time: fix mispredictions, then advance a
+        # step unless we must wait for the opponent. Returns True if we advanced.
+        if self.rollback_from is not None:
+            self.rollback(self.rollback_from)
+            self.rollback_from = None
+        self.confirm()
+        
+        if self.game_over():
+            # Stop here; a rollback may still take the point away
+            return False
+        if self.frame - self.remote_confirmed > MAX_ROLLBACK:
+            # Too far ahead of what we know; wait instead of guessing more
+            self.stalls += 1
+            return False
+        if self.sync_cooldown > 0:
+            self.sync_cooldown -= 1
+        elif self.advantage() - self.remote_advantage >= 2:
+            # Our clock runs ahead of the opponent's: give them a step
+            self.sync_cooldown = SYNC_INTERVAL
+            self.stalls += 1
+            return False
+        
+        self.local_inputs[self.frame + self.input_delay] = direction
+        self.simulate(self.frame)
+        self.frame += 1
+        return True
+    
+    def simulate(self, frame):
+        self.snapshots[frame] = save_state(self.left, self.right, self.ball)
+        remote = self.remote_inputs.get(frame)
+        if remote is None:
+            # Predict: the opponent keeps doing what they did last
+            remote = self.remote_inputs.get(self.remote_confirmed, 0)
+        self.used_remote[frame] = remote
+        
+        local = self.local_inputs[frame]
+        if self.side == 0:
+            net_step(self.left, self.right, self.ball, local, remote)
+        else:
+            net_step(self.left, self.right, self.ball, remote, local)
+    
+    def rollback(self, frame):
+        load_state(self.left, self.right, self.ball, self.snapshots[frame])
+        self.rollbacks += 1
+        self.rollback_steps += self.frame - frame
+        for replayed in range(frame, self.frame):
+            self.simulate(replayed)
+    
+    def confirm(self):
+        # States before remote_confirmed + 1 can't change any more: checksum
+        # them for the desync check and drop what rollback no longer needs
+        final = self.remote_confirmed + 1
+        for frame in [frame for frame in self.snapshots if frame <= final]:
+            if frame % CHECKSUM_INTERVAL == 0 and frame not in self.checksums:
+                self.checksums[frame] = state_checksum(self.snapshots[frame])
+                self.latest_checksum = (frame, self.checksums[frame])
+                self.compare_checksum(frame)
+            if frame < final:
+                del self.snapshots[frame]
+                del self.used_remote[frame]
+        
+        # Inputs go once they are simulated and final, and (ours) acknowledged.
+        # The opponent may be ahead, so confirmed inputs can still be in our future.
+        oldest_needed = min(self.remote_confirmed, self.frame)
+        for frame in [frame for frame in self.remote_inputs if frame < oldest_needed]:
+            del self.remote_inputs[frame]
+        oldest_needed = min(self.peer_ack + 1, oldest_needed)
+        for frame in [frame for frame in self.local_inputs if frame < oldest_needed]:
+            del self.local_inputs[frame]
+        for checksums in (self.checksums, self.remote_checksums):
+            for frame in [frame for frame in checksums if frame < final - 10 * CHECKSUM_INTERVAL]:
+                del checksums[frame]
+    
+    def compare_checksum(self, frame):
+        if frame in self.checksums and frame in self.remote_checksums:
+            if self.checksums[frame] != self.remote_checksums[frame] and self.desync_frame is None:
+                self.desync_frame = frame
+                print(f"Desync: states differ at step {frame}")
+
+class LinkSimulator:
+    # Bad network on localhost: outgoing packets are dropped with probability
+    # loss, the rest are delayed by delay +- jitter seconds (and may arrive
+    # out of order, as on a real network)
+    def __init__(self, delay=0, jitter=0, loss=0):
+        self.delay = delay
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random()
+    
+    def send(self, loop, transport, data, addr):
+        if self.loss and self.rng.random() < self.loss:
+            return
+        delay = self.delay + self.rng.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            loop.call_later(delay, transport.sendto, data, addr)
+        else:
+            transport.sendto(data, addr)
+
+class PeerProtocol(asyncio.DatagramProtocol):
+    def __init__(self, peer):
+        self.peer = peer
+    
+    def datagram_received(self, data, addr):
+        self.peer.datagram_received(data, addr)
+    
+    def error_received(self, exc):
+        # E.g. ICMP port unreachable while the other side isn't up yet
+        pass
+
+class NetPeer:
+    # The UDP side. The host waits for a HELLO and answers with WELCOME
+    # (the match seed and input delay); the client repeats HELLO until it is
+    # welcomed. After that, input packets are queued in inbox for the game
+    # thread, and send() may be called from any thread.
+    def __init__(self, host, port, hosting, input_delay=DEFAULT_INPUT_DELAY, link=None):
+        self.address = (host, port)
+        self.hosting = hosting
+        self.input_delay = input_delay
+        self.seed = random.randrange(2 ** 32) if hosting else None
+        self.link = link or LinkSimulator()
+        self.peer_addr = None if hosting else self.address
+        self.transport = None
+        self.connected = threading.Event()
+        self.inbox = deque()
+        self.last_heard = None
+        self.error = None
+        
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.run, name="pong-net", daemon=True)
+    
+    def start(self):
+        self.thread.start()
+    
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.open())
+        except OSError as e:
+            self.error = str(e)
+            return
+        self.loop.run_forever()
+        self.transport.close()
+    
+    async def open(self):
+        if self.hosting:
+            self.transport, _ = await self.loop.create_datagram_endpoint(
+                lambda: PeerProtocol(self), local_addr=self.address)
+        else:
+            self.transport, _ = await self.loop.create_datagram_endpoint(
+                lambda: PeerProtocol(self), remote_addr=self.address)
+            self.loop.create_task(self.say_hello())
+    
+    async def say_hello(self):
+        while not self.connected.is_set():
+            self.transmit(HELLO)
+            await asyncio.sleep(HELLO_INTERVAL)
+    
+    def datagram_received(self, data, addr):
+        kind = data[:1]
+        if self.hosting and kind == HELLO:
+            if self.peer_addr is None:
+                self.peer_addr = addr
+            if addr == self.peer_addr:
+                # Answer every HELLO, in case a WELCOME got lost
+                self.transmit(struct.pack(WELCOME_FORMAT, WELCOME, self.seed, self.input_delay))
+                self.last_heard = time.perf_counter()
+                self.connected.set()
+        elif not self.hosting and kind == WELCOME and not self.connected.is_set():
+            _, self.seed, self.input_delay = struct.unpack(WELCOME_FORMAT, data)
+            # The host as the socket reports it: we may have been given a
+            # hostname, but INPUTS packets arrive from a numeric address
+            self.peer_addr = addr
+            self.last_heard = time.perf_counter()
+            self.connected.set()
+        elif kind == INPUTS and addr == self.peer_addr and self.connected.is_set():
+            self.last_heard = time.perf_counter()
+            self.inbox.append(data)
+    
+    def transmit(self, data):
+        # Event loop thread only
+        self.link.send(self.loop, self.transport, data, self.peer_addr if self.hosting else None)
+    
+    def send(self, data):
+        self.loop.call_soon_threadsafe(self.transmit, data)
+    
+    def close(self):
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+class NetPongScene(Scene):
+    caption = "Retro Pong - Network"
+    
+    def __init__(self, peer, autoplay=False):
+        super().__init__()
+        self.peer = peer
+        self.autoplay = autoplay  # let a simple AI press the keys (for soak tests)
+        self.session = None
+        self.court = None
+        self.up = False
+        self.down = False
+        self.game_state = "waiting"  # waiting, playing, game_over, disconnected
+    
+    def enter(self, surface):
+        retro_pong.screen = surface
+        super().enter(surface)
+    
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                self.running = False
+            if event.key == pygame.K_UP:
+                self.up = True
+            if event.key == pygame.K_DOWN:
+                self.down = True
+        if event.type == pygame.KEYUP:
+            if event.key == pygame.K_UP:
+                self.up = False
+            if event.key == pygame.K_DOWN:
+                self.down = False
+    
+    def direction(self):
+        if self.autoplay:
+            paddle = self.session.paddles[0]
+            offset = self.session.ball.rect.centery - paddle.rect.centery
+            return (offset > 0) - (offset < 0)
+        return self.down - self.up
+    
+    def update(self, dt):
+        if self.game_state == "waiting":
+            if self.peer.connected.is_set():
+                self.session = RollbackSession(self.peer.seed, 0 if self.peer.hosting else 1,
+                                               self.peer.input_delay)
+                labels = ("YOU", "OPPONENT") if self.session.side == 0 else ("OPPONENT", "YOU")
+                self.court = Court(labels)
+                self.game_state = "playing"
+            return
+        
+        while self.peer.inbox:
+            self.session.receive(self.peer.inbox.popleft())
+        if self.game_state == "playing":
+            self.session.tick(self.direction())
+            if self.session.finished():
+                self.game_state = "game_over"
+            elif time.perf_counter() - self.peer.last_heard > PEER_TIMEOUT:
+                self.game_state = "disconnected"
+        # Keep sending after the end too, the opponent may still need our inputs
+        self.peer.send(self.session.make_packet())
+    
+    def invalidate(self):
+        if self.court is not None:
+            self.court.invalidate()
+    
+    def draw(self, surface, alpha=1.0):
+        if self.game_state == "waiting":
+            surface.fill(BLACK)
+            if self.peer.error:
+                message = f"Network error: {self.peer.error}"
+            elif self.peer.hosting:
+                message = f"Waiting for an opponent on port {self.peer.address[1]}..."
+            else:
+                message = f"Connecting to {self.peer.address[0]}:{self.peer.address[1]}..."
+            text = render_text(font_medium, message, True, WHITE)
+            surface.blit(text, text.get_rect(center=(WIDTH // 2, HEIGHT // 2)))
+            return
+        
+        mine, theirs = self.session.paddles
+        if self.game_state == "game_over":
+            draw_game_over(mine, theirs)
+            return
+        
+        dirty = self.court.draw(self.session.left, self.session.right, self.session.ball, alpha)
+        if self.game_state == "disconnected":
+            message, font, y = "Connection lost - press ESC", font_medium, HEIGHT // 2
+        elif self.session.desync_frame is not None:
+            message, font, y = f"DESYNC at step {self.session.desync_frame}", font_small, HEIGHT - 60
+        else:
+            return dirty
+        # Messages go over the court: repaint it all next frame
+        text = render_text(font, message, True, WHITE)
+        surface.blit(text, text.get_rect(center=(WIDTH // 2, y)))
+        self.court.invalidate()
+
+def main(peer, autoplay=False):
+    peer.start()
+    scene = NetPongScene(peer, autoplay)
+    run_scene(scene, init_display())
+    peer.close()
+    
+    session = scene.session
+    if session is not None:
+        print(f"{session.frame} steps, {session.rollbacks} rollbacks "
+              f"({session.rollback_steps} steps re-simulated), {session.stalls} stalls, "
+              f"score {session.left.score} - {session.right.score}")
+    pygame.quit()
+    sys.exit()
+
+def input_delay(text):
+    # Steps of input delay; WELCOME carries it in one byte
+    delay = int(text)
+    if not 0 <= delay <= MAX_INPUT_DELAY:
+        raise argparse.ArgumentTypeError(f"input delay must be 0 to {MAX_INPUT_DELAY} steps")
+    return delay
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Two-player Retro Pong over UDP")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--host", action="store_true", help="wait for an opponent (left paddle)")
+    mode.add_argument("--connect", metavar="HOST", help="join a hosted game (right paddle)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--bind", default="0.0.0.0", help="address the host listens on")
+    parser.add_argument("--input-delay", type=input_delay, default=DEFAULT_INPUT_DELAY,
+                        help="steps of input delay (the host's setting is used)")
+    parser.add_argument("--lag", type=float, default=0,
+                        help="simulated one-way latency of outgoing packets, in ms")
+    parser.add_argument("--jitter", type=float, default=0, help="simulated latency jitter, in ms")
+    parser.add_argument("--loss", type=float, default=0,
+                        help="simulated packet loss, 0..1")
+    parser.add_argument("--autoplay", action="store_true",
+                        help="a simple AI plays our paddle, for testing the connection")
+    add_frame_stats_args(parser)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    link = LinkSimulator(args.lag / 1000, args.jitter / 1000, args.loss)
+    if args.host:
+        peer = NetPeer(args.bind, args.port, True, args.input_delay, link)
+    else:
+        peer = NetPeer(args.connect, args.port, False, link=link)
+    apply_frame_stats_args(args)
+    main(peer, args.autoplay)
@@ -0,0 +1,206 @@
+import os
+import time
+import random
+import argparse
+import functools
+import itertools
+import multiprocessing
+
+from retro_engine import enable_headless
+from retro_pong import (AI_ERROR_RATE, AI_DIFFICULTY, PADDLE_SPEED, WINNING_SCORE, MAX_MATCH_TICKS,
+                        ai_movement, PredictiveAI, new_match, step_game)
+
+# Round-robin tournament between Pong AI configurations, played headless
+# on every core. Each configuration plays every other one on both sides of
+# the court (the left paddle moves first, so sides aren't quite equal).
+# Match i of a run uses seed + i, so a run is reproducible whatever the
+# number of workers.
+#
+# AI specs:
+#   classic[:ERROR_RATE[:SPEED]]              ai_movement (defaults 0.05, 8)
+#   predictive:DIFFICULTY[:SPEED]             PredictiveAI preset (easy, medium, hard)
+#   predictive:ERROR:DELAY[:SPEED]            PredictiveAI with its error in pixels
+#                                             and reaction delay in steps
+
+DEFAULT_ROSTER = [
+    "classic",
+    "classic:0.15",
+    "classic:0.05:6",
+    "predictive:easy",
+    "predictive:medium",
+    "predictive:hard",
+    "predictive:hard:6",
+]
+DEFAULT_MATCHES = 20  # per pairing and side
+RALLY_BUCKETS = [(0, 0), (1, 1), (2, 3), (4, 7), (8, 15), (16, 31), (32, None)]  # paddle hits
+
+def make_ai(spec):
+    kind, *params = spec.split(":")
+    if kind == "classic" and len(params) <= 2:
+        error_rate = float(params[0]) if params else AI_ERROR_RATE
+        speed = int(params[1]) if len(params) > 1 else PADDLE_SPEED
+        return functools.partial(ai_movement, error_rate=error_rate, speed=speed)
+    if kind == "predictive" and params and params[0] in AI_DIFFICULTY and len(params) <= 2:
+        speed = int(params[1]) if len(params) > 1 else PADDLE_SPEED
+        return PredictiveAI(params[0], speed=speed)
+    if kind == "predictive" and 2 <= len(params) <= 3:
+        speed = int(params[2]) if len(params) > 2 else PADDLE_SPEED
+        return PredictiveAI(prediction_error=float(params[0]), reaction_delay=int(params[1]), speed=speed)
+    raise ValueError(f"unknown AI spec {spec!r}")
+
+def play_match(job):
+    # Worker side: one match. Returns the specs, scores, ticks and the
+    # paddle hits of every rally.
+    left_spec, right_spec, seed = job
+    left_paddle, right_paddle, ball = new_match(seed)
+    left_ai, right_ai = make_ai(left_spec), make_ai(right_spec)
+    
+    ticks = 0
+    points = 0
+    hits = 0
+    rallies = []
+    direction = ball.speed_x > 0
+    while max(left_paddle.score, right_paddle.score) < WINNING_SCORE and ticks < MAX_MATCH_TICKS:
+        left_ai(left_paddle, ball)
+        step_game(left_paddle, right_paddle, ball, right_ai)
+        ticks += 1
+        
+        # A point ends the rally; otherwise a change of direction is a paddle hit
+        if left_paddle.score + right_paddle.score != points:
+            points = left_paddle.score + right_paddle.score
+            rallies.append(hits)
+            hits = 0
+        elif (ball.speed_x > 0) != direction:
+            hits += 1
+        direction = ball.speed_x > 0
+    
+    return left_spec, right_spec, left_paddle.score, right_paddle.score, ticks, rallies
+
+class Standing:
+    def __init__(self, spec):
+        self.spec = spec
+        self.wins = 0
+        self.losses = 0
+        self.draws = 0
+        self.rallies = []
+    
+    @property
+    def matches(self):
+        return self.wins + self.losses + self.draws
+    
+    def win_rate(self):
+        # Draws (matches stopped at MAX_MATCH_TICKS) count as half a win
+        return (self.wins + self.draws / 2) / self.matches if self.matches else 0
+
+def percentile(values, p):
+    # values must be sorted
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+def run_tournament(roster, matches, seed, workers):
+    jobs = [(left, right) for left, right in itertools.permutations(roster, 2)
+            for _ in range(matches)]
+    jobs = [(left, right, seed + i) for i, (left, right) in enumerate(jobs)]
+    
+    standings = {spec: Standing(spec) for spec in roster}
+    head_to_head = {}  # (spec, opponent) -> [wins, matches]
+    ticks = 0
+    
+    start = time.perf_counter()
+    # Shut down with close() and join(), not terminate(): importing
+    # retro_pong initialises SDL, which turns SIGTERM into a quit event
+    pool = multiprocessing.Pool(workers)
+    try:
+        chunksize = max(1, len(jobs) // (workers * 8))
+        for left, right, left_score, right_score, match_ticks, rallies in \
+                pool.imap_unordered(play_match, jobs, chunksize):
+            ticks += match_ticks
+            for spec, opponent, score, other in ((left, right, left_score, right_score),
+                                                 (right, left, right_score, left_score)):
+                standing = standings[spec]
+                record = head_to_head.setdefault((spec, opponent), [0, 0])
+                record[1] += 1
+                if score > other:
+                    standing.wins += 1
+                    record[0] += 1
+                elif score < other:
+                    standing.losses += 1
+                else:
+                    standing.draws += 1
+                    record[0] += 0.5
+                standing.rallies.extend(rallies)
+    finally:
+        pool.close()
+        pool.join()
+    elapsed = time.perf_counter() - start
+    
+    report(roster, standings, head_to_head, len(jobs), ticks, elapsed, workers, seed)
+
+def report(roster, standings, head_to_head, matches, ticks, elapsed, workers, seed):
+    print(f"{matches} matches on {workers} workers in {elapsed:.1f}s: "
+          f"{matches / elapsed:,.1f} matches/s, {ticks / elapsed:,.0f} ticks/s (seed {seed})")
+    
+    width = max(len(spec) for spec in roster)
+    print()
+    print(f"{'':<{width}}  {'':>5} {'':>5} {'':>4}  {'':>6}   {'hits per rally':>22}")
+    print(f"{'AI':<{width}}  {'W':>5} {'L':>5} {'D':>4}  {'win %':>6}   "
+          f"{'mean':>7} {'p50':>4} {'p90':>4} {'max':>4}")
+    for standing in sorted(standings.values(), key=Standing.win_rate, reverse=True):
+        rallies = sorted(standing.rallies)
+        mean = sum(rallies) / len(rallies) if rallies else 0
+        print(f"{standing.spec:<{width}}  {standing.wins:>5} {standing.losses:>5} {standing.draws:>4}  "
+              f"{standing.win_rate() * 100:>6.1f}   "
+              f"{mean:>7.1f} {percentile(rallies, 50) if rallies else 0:>4} "
+              f"{percentile(rallies, 90) if rallies else 0:>4} {rallies[-1] if rallies else 0:>4}")
+    
+    # Win rate of each row against each column
+    print()
+    columns = range(len(roster))
+    print(f"{'win % vs':<{width}}  " + " ".join(f"{i + 1:>5}" for i in columns))
+    for i, spec in enumerate(roster):
+        cells = []
+        for opponent in roster:
+            wins, played = head_to_head.get((spec, opponent), (0, 0))
+            cells.append(f"{wins / played * 100:>5.0f}" if played else f"{'-':>5}")
+        print(f"{f'{i + 1} {spec}':<{width + 2}}" + " ".join(cells))
+    
+    # Rally length distribution over all matches (every rally is counted
+    # once for each of the two players, which doesn't change the shares)
+    rallies = [hits for standing in standings.values() for hits in standing.rallies]
+    if not rallies:
+        return
+    print()
+    print("Rally length (paddle hits):")
+    for low, high in RALLY_BUCKETS:
+        count = sum(1 for hits in rallies if hits >= low and (high is None or hits <= high))
+        label = f"{low}+" if high is None else (f"{low}" if low == high else f"{low}-{high}")
+        share = count / len(rallies)
+        print(f"  {label:>6}  {share * 100:5.1f}%  {'#' * round(share * 50)}")
+
+def ai_spec(spec):
+    try:
+        make_ai(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return spec
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Headless Pong AI tournament")
+    parser.add_argument("--ai", action="append", type=ai_spec, metavar="SPEC",
+                        help="add an AI configuration (repeatable; default: a built-in roster). "
+                             "SPEC is classic[:ERROR_RATE[:SPEED]], predictive:DIFFICULTY[:SPEED] "
+                             "or predictive:ERROR:DELAY[:SPEED]")
+    parser.add_argument("--matches", type=int, default=DEFAULT_MATCHES,
+                        help="matches per pairing and side")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: one per core)")
+    parser.add_argument("--seed", type=int, help="base seed, for a reproducible tournament")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    roster = list(dict.fromkeys(args.ai or DEFAULT_ROSTER))
+    if len(roster) < 2:
+        raise SystemExit("A tournament needs at least two different AIs")
+    enable_headless()  # Workers inherit the dummy video driver
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 31)
+    run_tournament(roster, args.matches, seed, args.workers)
@@ -1,6 +1,12 @@
 import pygame
 import sys
 import random
+import time
+import argparse
+from collections import deque
+
+from retro_engine import (Scene, run_scene, render_text, enable_headless,
+                          add_frame_stats_args, apply_frame_stats_args)
 
 # Initialize pygame
 pygame.init()
@@ -11,8 +17,7 @@ GRID_SIZE = 20
 GRID_WIDTH = WIDTH // GRID_SIZE
 GRID_HEIGHT = HEIGHT // GRID_SIZE
 
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Retro Snake")
+screen = None  # Set by init_display() or by the host running SnakeScene
 
 # Colors
 BLACK = (0, 0, 0)
@@ -31,6 +36,59 @@ UP = (0, -1)
 DOWN = (0, 1)
 LEFT = (-1, 0)
 RIGHT = (1, 0)
+DIRECTIONS = (UP, DOWN, LEFT, RIGHT)
+KEY_DIRECTIONS = {pygame.K_UP: UP, pygame.K_DOWN: DOWN, pygame.K_LEFT: LEFT, pygame.K_RIGHT: RIGHT}
+TURN_BUFFER = 3  # turns remembered between two moves
+
+MAX_GAME_STEPS = 10000  # headless safety net for drivers that never die
+
+# Large-world mode (--world): the board is bigger than the window
+EMPTY, BODY, FOOD = 0, 1, 2  # World cell states
+WORLD_FOOD_SPACING = 2000  # cells per food item
+FOOD_TRIES = 64  # random picks before a food item is given up on (the world is nearly full)
+CAMERA_MARGIN = 8  # cells kept between the head and the edge of the view
+
+# Arena mode (--arena): many snakes on one large board
+ARENA_SIZE = (200, 150)
+ARENA_COLORS = [(255, 165, 0), (0, 170, 255), (255, 0, 255), (255, 255, 0), (0, 255, 255),
+                (160, 100, 255), (255, 120, 160), (170, 255, 120)]
+ARENA_FOOD_PER_SNAKE = 3
+ARENA_SIGHT = 8  # cells an AI snake looks around for food
+ARENA_RESPAWN_TICKS = 20
+ARENA_CELLS_PER_SNAKE = 8  # board cells an arena needs per snake: room for its body and food
+ARENA_SPEED = 10  # arena ticks per second, whoever the camera follows
+BUCKET_SIZE = 8  # cells per side of a SpatialHash bucket
+
+class FreeCells:
+    # Board cells the snake doesn't cover, in an array with a cell -> index
+    # map: add, remove (the last entry fills the gap) and a uniform random
+    # pick are O(1) however full the board is
+    def __init__(self, occupied=()):
+        self.cells = [(x, y) for y in range(GRID_HEIGHT) for x in range(GRID_WIDTH)
+                      if (x, y) not in occupied]
+        self.index = {cell: i for i, cell in enumerate(self.cells)}
+    
+    def __len__(self):
+        return len(self.cells)
+    
+    def __contains__(self, cell):
+        return cell in self.index
+    
+    def add(self, cell):
+        self.index[cell] = len(self.cells)
+        self.cells.append(cell)
+    
+    def remove(self, cell):
+        i = self.index.pop(cell)
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[i] = last
+            self.index[last] = i
+    
+    def random_cell(self):
+        if not self.cells:
+            return None
+        return self.cells[random.randrange(len(self.cells))]
 
 class Snake:
     def __init__(self):
@@ -38,15 +96,24 @@ class Snake:
     
     def reset(self):
         self.length = 3
-        self.positions = [(GRID_WIDTH // 2, GRID_HEIGHT // 2)]
+        # Body cells, head first; occupied holds the same cells for O(1) lookups
+        self.positions = deque([(GRID_WIDTH // 2, GRID_HEIGHT // 2)])
+        self.occupied = set(self.positions)
+        self.free_cells = FreeCells(self.occupied)
         self.direction = RIGHT
         self.score = 0
         self.grow_to = 3  # Initial length
         self.is_alive = True
+        self.moves = 0  # lets a renderer tell how many moves it has missed
     
     def get_head_position(self):
         return self.positions[0]
     
+    @property
+    def won(self):
+        # The snake covers the whole board
+        return not self.free_cells
+    
     def update(self):
         if not self.is_alive:
             return
@@ -55,17 +122,22 @@ class Snake:
         x, y = self.direction
         new_head = ((head[0] + x) % GRID_WIDTH, (head[1] + y) % GRID_HEIGHT)
         
-        # Check for collision with self
-        if new_head in self.positions[1:]:
+        # Check for collision with self (the tail counts even if it moves on)
+        if new_head in self.occupied:
             self.is_alive = False
             return
         
         # Move snake
-        self.positions.insert(0, new_head)
+        self.moves += 1
+        self.positions.appendleft(new_head)
+        self.occupied.add(new_head)
+        self.free_cells.remove(new_head)
         
         # Grow snake if needed
         if len(self.positions) > self.grow_to:
-            self.positions.pop()
+            tail = self.positions.pop()
+            self.occupied.remove(tail)
+            self.free_cells.add(tail)
     
     def change_direction(self, direction):
         # Prevent 180 degree turns
@@ -85,31 +157,696 @@ class Snake:
             pygame.draw.rect(surface, BLACK, rect, 1)
 
 class Food:
-    def __init__(self, snake_positions):
-        self.position = self.randomize_position(snake_positions)
+    def __init__(self, free_cells):
+        self.position = self.randomize_position(free_cells)
     
-    def randomize_position(self, snake_positions):
-        position = (random.randint(0, GRID_WIDTH - 1), random.randint(0, GRID_HEIGHT - 1))
-        while position in snake_positions:
-            position = (random.randint(0, GRID_WIDTH - 1), random.randint(0, GRID_HEIGHT - 1))
-        return position
+    def randomize_position(self, free_cells):
+        # Any cell the snake isn't on, uniformly; None once the board is full
+        return free_cells.random_cell()
     
     def draw(self, surface):
+        if self.position is None:
+            return
         rect = pygame.Rect(self.position[0] * GRID_SIZE, self.position[1] * GRID_SIZE, GRID_SIZE, GRID_SIZE)
         pygame.draw.rect(surface, RED, rect)
         pygame.draw.rect(surface, BLACK, rect, 1)
 
+def step_snake(snake, food):
+    # One tick of play; returns the food, which is replaced once eaten.
+    # Touches no display, so it also runs headless.
+    snake.update()
+    
+    # Check for food collision
+    if snake.get_head_position() == food.position:
+        snake.grow()
+        food = Food(snake.free_cells)
+    return food
+
+def random_policy(snake, food):
+    # Baseline driver for headless runs: mostly straight, sometimes a random turn
+    if random.random() < 0.2:
+        return random.choice(DIRECTIONS)
+    return snake.direction
+
+def simulate(games=100, policy=random_policy, max_steps=MAX_GAME_STEPS):
+    # Headless games steered by policy(snake, food) -> direction: no
+    # rendering and no frame pacing. Returns (score, steps) per game.
+    results = []
+    for _ in range(games):
+        snake = Snake()
+        food = Food(snake.free_cells)
+        
+        steps = 0
+        while snake.is_alive and not snake.won and steps < max_steps:
+            snake.change_direction(policy(snake, food))
+            food = step_snake(snake, food)
+            steps += 1
+        
+        results.append((snake.score, steps))
+    return results
+
+def board_cycle():
+    # A closed path through every cell without wrapping around the edges:
+    # along the top row, back and forth over the rest of the board (which
+    # has an odd number of rows), then up the first column
+    cells = [(x, 0) for x in range(GRID_WIDTH)]
+    for y in range(1, GRID_HEIGHT):
+        columns = range(GRID_WIDTH - 1, 0, -1) if y % 2 else range(1, GRID_WIDTH)
+        cells.extend((x, y) for x in columns)
+    cells.extend((0, y) for y in range(GRID_HEIGHT - 1, 0, -1))
+    return cells
+
+def benchmark_ticks(lengths=(3, 100, 300, 600, 900, GRID_WIDTH * GRID_HEIGHT - 1), ticks=20000):
+    # Tick and food placement cost against snake length: a snake of each
+    # length follows board_cycle() (one free cell at the longest), so it never dies
+    cycle = board_cycle()
+    turns = {cell: (nxt[0] - cell[0], nxt[1] - cell[1])
+             for cell, nxt in zip(cycle, cycle[1:] + cycle[:1])}
+    for length in lengths:
+        snake = Snake()
+        snake.positions = deque(reversed(cycle[:length]))
+        snake.occupied = set(snake.positions)
+        snake.free_cells = FreeCells(snake.occupied)
+        snake.grow_to = length
+        
+        start = time.perf_counter()
+        for _ in range(ticks):
+            snake.direction = turns[snake.positions[0]]
+            snake.update()
+        elapsed = time.perf_counter() - start
+        assert snake.is_alive and len(snake.positions) == length
+        
+        start = time.perf_counter()
+        for _ in range(ticks):
+            Food(snake.free_cells)
+        placement = time.perf_counter() - start
+        print(f"length {length:5}: {elapsed / ticks * 1e6:6.2f} us/tick, "
+              f"food placement {placement / ticks * 1e6:5.2f} us")
+
 def draw_grid(surface):
     for y in range(0, HEIGHT, GRID_SIZE):
         for x in range(0, WIDTH, GRID_SIZE):
             rect = pygame.Rect(x, y, GRID_SIZE, GRID_SIZE)
             pygame.draw.rect(surface, BLACK, rect, 1)
 
+class Board:
+    # Incremental renderer for the playing field. The empty board (black
+    # with its grid) and the three kinds of cell are rendered once; after a
+    # move only the new head, the old head (now body), the vacated tail cell,
+    # the food and the score are painted, and draw() returns just their
+    # rects. Cost per frame doesn't depend on the snake's length.
+    def __init__(self):
+        self.background = None
+        self.tiles = None
+        self.full_redraw = True
+        self.snake = None     # the snake drawn last frame
+        self.moves = 0        # its move count then
+        self.drawn = deque()  # its cells as drawn, head first
+        self.food = None      # food position drawn
+        self.score = None
+        self.score_rect = None
+    
+    def render(self):
+        self.background = pygame.Surface((WIDTH, HEIGHT))
+        if pygame.display.get_surface() is not None:
+            self.background = self.background.convert()
+        self.background.fill(BLACK)
+        draw_grid(self.background)
+        
+        self.tiles = {}
+        for color in (GREEN, DARK_GREEN, RED):
+            tile = self.background.subsurface((0, 0, GRID_SIZE, GRID_SIZE)).copy()
+            tile.fill(color)
+            pygame.draw.rect(tile, BLACK, tile.get_rect(), 1)
+            self.tiles[color] = tile
+    
+    def invalidate(self):
+        self.full_redraw = True
+    
+    def cell_rect(self, cell):
+        return pygame.Rect(cell[0] * GRID_SIZE, cell[1] * GRID_SIZE, GRID_SIZE, GRID_SIZE)
+    
+    def paint(self, surface, cell, color):
+        rect = self.cell_rect(cell)
+        if color is None:
+            surface.blit(self.background, rect, rect)
+        else:
+            surface.blit(self.tiles[color], rect)
+        return rect
+    
+    def redraw(self, surface, snake, food):
+        # Everything: board, snake, food and score
+        if self.background is None:
+            self.render()
+        self.full_redraw = False
+        surface.blit(self.background, (0, 0))
+        snake.draw(surface)
+        food.draw(surface)
+        self.snake = snake
+        self.moves = snake.moves
+        self.drawn = deque(snake.positions)
+        self.food = food.position
+        self.score = None
+        self.draw_score(surface, [])
+        return [surface.get_rect()]
+    
+    def draw(self, surface, snake, food):
+        if self.full_redraw or snake is not self.snake:
+            return self.redraw(surface, snake, food)
+        # Normally one move since the last frame, a few after a stall
+        moved = min(snake.moves - self.moves, len(snake.positions))
+        dirty = []
+        
+        if moved:
+            # Erase the cells the tail has left
+            for _ in range(len(self.drawn) + moved - len(snake.positions)):
+                cell = self.drawn.pop()
+                if cell not in snake.occupied:
+                    dirty.append(self.paint(surface, cell, RED if cell == food.position else None))
+            
+            # The old head is body now; the new cells go in front of it
+            if self.drawn and self.drawn[0] in snake.occupied:
+                dirty.append(self.paint(surface, self.drawn[0], DARK_GREEN))
+            for i in range(moved - 1, -1, -1):
+                cell = snake.positions[i]
+                dirty.append(self.paint(surface, cell, GREEN if i == 0 else DARK_GREEN))
+                self.drawn.appendleft(cell)
+            self.moves = snake.moves
+        
+        if food.position != self.food:
+            if self.food is not None and self.food not in snake.occupied:
+                dirty.append(self.paint(surface, self.food, None))
+            if food.position is not None:
+                dirty.append(self.paint(surface, food.position, RED))
+            self.food = food.position
+        
+        self.draw_score(surface, dirty)
+        return dirty
+    
+    def draw_score(self, surface, dirty):
+        # The score sits on top of the board: repaint its corner when it
+        # changes or when a cell under it was repainted
+        score_text = render_text(font_small, f"Score: {self.snake.score}", True, WHITE)
+        rect = score_text.get_rect(topleft=(10, 10))
+        area = rect.union(self.score_rect) if self.score_rect else rect
+        if self.score == self.snake.score and area.collidelist(dirty) == -1:
+            return
+        
+        surface.blit(self.background, area, area)
+        head = self.snake.get_head_position()
+        for y in range(area.top // GRID_SIZE, (area.bottom - 1) // GRID_SIZE + 1):
+            for x in range(area.left // GRID_SIZE, (area.right - 1) // GRID_SIZE + 1):
+                if (x, y) == head:
+                    self.paint(surface, (x, y), GREEN)
+                elif (x, y) in self.snake.occupied:
+                    self.paint(surface, (x, y), DARK_GREEN)
+                elif (x, y) == self.food:
+                    self.paint(surface, (x, y), RED)
+        surface.blit(score_text, rect)
+        
+        self.score = self.snake.score
+        self.score_rect = rect
+        dirty.append(area)
+
+class World:
+    # Board of any size for the large-world mode. Every cell is one byte
+    # (EMPTY, BODY or FOOD) of a flat bytearray, so a 2000x2000 world takes
+    # 4 MB; a tick and a frame only touch the cells they need.
+    def __init__(self, width, height, food_count=None):
+        self.width = width
+        self.height = height
+        self.cells = bytearray(width * height)
+        self.food_count = food_count or max(1, width * height // WORLD_FOOD_SPACING)
+        self.food = 0
+    
+    def stock_food(self):
+        while self.food < self.food_count and self.place_food():
+            pass
+    
+    def index(self, cell):
+        return cell[1] * self.width + cell[0]
+    
+    def place_food(self):
+        # A random empty cell. The world is mostly empty, so the first pick
+        # nearly always does; returns False if none was found.
+        for _ in range(FOOD_TRIES):
+            i = random.randrange(len(self.cells))
+            if self.cells[i] == EMPTY:
+                self.cells[i] = FOOD
+                self.food += 1
+                return True
+        return False
+    
+    def row(self, y, x, width):
+        # Cell states of width cells of row y from column x, wrapping around
+        start = (y % self.height) * self.width
+        x %= self.width
+        if x + width <= self.width:
+            return self.cells[start + x:start + x + width]
+        return self.cells[start + x:start + self.width] + self.cells[start:start + x + width - self.width]
+
+class WorldSnake(Snake):
+    # Snake on a World: collisions and food are looked up in its cells
+    # instead of the occupied set and FreeCells, which would hold every
+    # cell of the board
+    def __init__(self, world):
+        self.world = world
+        super().__init__()
+    
+    def reset(self):
+        self.length = 3
+        self.positions = deque([(self.world.width // 2, self.world.height // 2)])
+        self.world.cells[self.world.index(self.positions[0])] = BODY
+        self.world.stock_food()
+        self.direction = RIGHT
+        self.score = 0
+        self.grow_to = 3
+        self.is_alive = True
+        self.moves = 0
+    
+    @property
+    def won(self):
+        return len(self.positions) == len(self.world.cells)
+    
+    def update(self):
+        if not self.is_alive:
+            return
+        
+        world = self.world
+        head = self.get_head_position()
+        x, y = self.direction
+        new_head = ((head[0] + x) % world.width, (head[1] + y) % world.height)
+        i = world.index(new_head)
+        state = world.cells[i]
+        if state == BODY:
+            self.is_alive = False
+            return
+        
+        self.moves += 1
+        self.positions.appendleft(new_head)
+        world.cells[i] = BODY
+        if len(self.positions) > self.grow_to:
+            world.cells[world.index(self.positions.pop())] = EMPTY
+        
+        if state == FOOD:
+            self.grow()
+            world.food -= 1
+            world.place_food()
+
+class WorldView:
+    # Camera and renderer for a World. The camera scrolls a cell at a time
+    # to keep the head CAMERA_MARGIN cells inside the window, and a redraw
+    # reads only the visible rows of the world, whatever its size.
+    def __init__(self, world):
+        self.world = world
+        self.left = 0  # world cell at the top left of the window
+        self.top = 0
+        self.background = None
+        self.tiles = None  # by cell state
+        self.head_tile = None
+        self.full_redraw = True
+        self.moves = None  # snake moves when last drawn
+    
+    def render(self):
+        self.background = pygame.Surface((WIDTH, HEIGHT))
+        if pygame.display.get_surface() is not None:
+            self.background = self.background.convert()
+        self.background.fill(BLACK)
+        draw_grid(self.background)
+        
+        tiles = []
+        for color in (BLACK, DARK_GREEN, RED, GREEN):
+            tile = self.background.subsurface((0, 0, GRID_SIZE, GRID_SIZE)).copy()
+            tile.fill(color)
+            pygame.draw.rect(tile, BLACK, tile.get_rect(), 1)
+            tiles.append(tile)
+        self.tiles = tiles[:3]  # EMPTY, BODY, FOOD
+        self.head_tile = tiles[3]
+    
+    def invalidate(self):
+        self.full_redraw = True
+    
+    def center_on(self, cell):
+        self.left = (cell[0] - GRID_WIDTH // 2) % self.world.width
+        self.top = (cell[1] - GRID_HEIGHT // 2) % self.world.height
+    
+    def follow(self, cell):
+        # Scroll just enough to keep cell clear of the window's edges
+        x = (cell[0] - self.left) % self.world.width
+        y = (cell[1] - self.top) % self.world.height
+        if x < CAMERA_MARGIN or x >= GRID_WIDTH - CAMERA_MARGIN:
+            x = min(max(x, CAMERA_MARGIN), GRID_WIDTH - CAMERA_MARGIN - 1)
+            self.left = (cell[0] - x) % self.world.width
+        if y < CAMERA_MARGIN or y >= GRID_HEIGHT - CAMERA_MARGIN:
+            y = min(max(y, CAMERA_MARGIN), GRID_HEIGHT - CAMERA_MARGIN - 1)
+            self.top = (cell[1] - y) % self.world.height
+    
+    def draw(self, surface, snake):
+        # Whole window when the snake has moved, nothing otherwise
+        if not self.full_redraw and snake.moves == self.moves:
+            return []
+        if self.background is None:
+            self.render()
+        self.full_redraw = False
+        self.moves = snake.moves
+        
+        head = snake.get_head_position()
+        self.follow(head)
+        surface.blit(self.background, (0, 0))
+        tiles = self.tiles
+        blits = []
+        for y in range(GRID_HEIGHT):
+            for x, state in enumerate(self.world.row(self.top + y, self.left, GRID_WIDTH)):
+                if state:
+                    blits.append((tiles[state], (x * GRID_SIZE, y * GRID_SIZE)))
+        x = (head[0] - self.left) % self.world.width
+        y = (head[1] - self.top) % self.world.height
+        blits.append((self.head_tile, (x * GRID_SIZE, y * GRID_SIZE)))
+        surface.blits(blits, False)
+        
+        score_text = render_text(font_small, f"Score: {snake.score}", True, WHITE)
+        surface.blit(score_text, (10, 10))
+        position = render_text(font_small, f"{head[0]}, {head[1]}", True, WHITE)
+        surface.blit(position, position.get_rect(topright=(WIDTH - 10, 10)))
+        return None
+
+def benchmark_world(sizes=(100, 500, 2000, 4000), ticks=20000, frames=200):
+    # Large-world tick and frame cost against world size, with a random-turn
+    # snake that swerves around its own body
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    for size in sizes:
+        world = World(size, size)
+        snake = WorldSnake(world)
+        start = time.perf_counter()
+        for _ in range(ticks):
+            head = snake.get_head_position()
+            for direction in (random_policy(snake, None),) + DIRECTIONS:
+                cell = ((head[0] + direction[0]) % size, (head[1] + direction[1]) % size)
+                if world.cells[world.index(cell)] != BODY and direction != (-snake.direction[0], -snake.direction[1]):
+                    snake.change_direction(direction)
+                    break
+            snake.update()
+        elapsed = time.perf_counter() - start
+        
+        view = WorldView(world)
+        start = time.perf_counter()
+        for _ in range(frames):
+            view.invalidate()
+            view.draw(surface, snake)
+        drawing = time.perf_counter() - start
+        print(f"world {size}x{size}: {len(world.cells) / 1e6:5.2f} MB, {world.food:5} food, "
+              f"{elapsed / ticks * 1e6:5.2f} us/tick, {drawing / frames * 1000:5.2f} ms/frame")
+
+class SpatialHash:
+    # Uniform grid index over a wrapping board: cell -> owner, with each
+    # BUCKET_SIZE x BUCKET_SIZE block of cells in its own dict. A lookup is
+    # two dict hits, and an area query only visits the blocks it overlaps.
+    def __init__(self, width, height, bucket_size=BUCKET_SIZE):
+        self.width = width
+        self.height = height
+        self.bucket_size = bucket_size
+        self.buckets = {}
+        self.count = 0
+    
+    def __len__(self):
+        return self.count
+    
+    def key(self, cell):
+        return (cell[0] // self.bucket_size, cell[1] // self.bucket_size)
+    
+    def get(self, cell):
+        bucket = self.buckets.get(self.key(cell))
+        return bucket.get(cell) if bucket else None
+    
+    def add(self, cell, owner):
+        self.buckets.setdefault(self.key(cell), {})[cell] = owner
+        self.count += 1
+    
+    def remove(self, cell):
+        key = self.key(cell)
+        bucket = self.buckets[key]
+        del bucket[cell]
+        if not bucket:
+            del self.buckets[key]
+        self.count -= 1
+    
+    def bucket_span(self, start, length, limit):
+        # Bucket numbers covering length cells from start along an axis of
+        # limit cells, wrapping (the last bucket may be narrower). A span
+        # that wraps round to where it started lists that bucket once.
+        spans = []
+        position = start % limit
+        length = min(length, limit)
+        while length > 0:
+            if position // self.bucket_size not in spans:
+                spans.append(position // self.bucket_size)
+            end = min((position // self.bucket_size + 1) * self.bucket_size, limit)
+            length -= end - position
+            position = end % limit
+        return spans
+    
+    def query(self, left, top, width, height):
+        # (cell, owner) for every cell in the rectangle, which may wrap
+        for column in self.bucket_span(left, width, self.width):
+            for row in self.bucket_span(top, height, self.height):
+                bucket = self.buckets.get((column, row))
+                if not bucket:
+                    continue
+                for cell, owner in bucket.items():
+                    if (cell[0] - left) % self.width < width and (cell[1] - top) % self.height < height:
+                        yield cell, owner
+
+class ArenaSnake(Snake):
+    # One of the snakes in an Arena; the arena moves it
+    def __init__(self, arena, number, human=False):
+        self.arena = arena
+        self.number = number
+        self.human = human
+        self.color = GREEN if human else ARENA_COLORS[number % len(ARENA_COLORS)]
+        self.respawn_tick = 0
+        super().__init__()
+    
+    def reset(self):
+        self.length = 3
+        self.positions = deque()
+        self.direction = RIGHT
+        self.score = 0
+        self.grow_to = 3
+        self.is_alive = False  # until the arena spawns it
+        self.moves = 0
+    
+    @property
+    def won(self):
+        return False
+
+class Arena:
+    # Many snakes on one wrapping board, all moving at once. Bodies and
+    # food live in two SpatialHash indexes, so collisions, eating and the
+    # AI's look around cost the same however long the snakes are: a tick
+    # is linear in the number of snakes.
+    def __init__(self, width, height, snakes, humans=0, food_count=None):
+        if snakes * ARENA_CELLS_PER_SNAKE > width * height:
+            raise ValueError(f"{snakes} snakes don't fit in a {width}x{height} arena")
+        self.width = width
+        self.height = height
+        self.bodies = SpatialHash(width, height)  # cell -> ArenaSnake
+        self.food = SpatialHash(width, height)    # cell -> True
+        self.food_count = food_count or snakes * ARENA_FOOD_PER_SNAKE
+        self.ticks = 0
+        self.snakes = [ArenaSnake(self, i, i < humans) for i in range(snakes)]
+        for snake in self.snakes:
+            self.spawn(snake, anywhere=True)
+        while len(self.food) < self.food_count and self.place_food():
+            pass
+    
+    def wrap(self, cell, direction):
+        return ((cell[0] + direction[0]) % self.width, (cell[1] + direction[1]) % self.height)
+    
+    def is_free(self, cell):
+        return self.bodies.get(cell) is None and self.food.get(cell) is None
+    
+    def random_free_cell(self):
+        for _ in range(FOOD_TRIES):
+            cell = (random.randrange(self.width), random.randrange(self.height))
+            if self.is_free(cell):
+                return cell
+        return None
+    
+    def place_food(self):
+        cell = self.random_free_cell()
+        if cell is None:
+            return False
+        self.food.add(cell, True)
+        return True
+    
+    def spawn(self, snake, anywhere=False):
+        # A fresh snake somewhere with room ahead of it. If random picks
+        # keep missing, a respawn waits for the next tick; with anywhere,
+        # every cell is searched and any free one will do.
+        for _ in range(FOOD_TRIES):
+            cell = self.random_free_cell()
+            direction = random.choice(DIRECTIONS)
+            if cell is not None and all(self.bodies.get(self.wrap(cell, (direction[0] * i, direction[1] * i))) is None
+                                        for i in range(1, 4)):
+                break
+        else:
+            if not anywhere:
+                return False
+            cells = [(x, y) for y in range(self.height) for x in range(self.width) if self.is_free((x, y))]
+            if not cells:
+                return False
+            cell = random.choice(cells)
+            direction = random.choice(DIRECTIONS)
+        snake.reset()
+        snake.positions.append(cell)
+        snake.direction = direction
+        snake.is_alive = True
+        self.bodies.add(cell, snake)
+        return True
+    
+    def steer(self, snake):
+        # AI: towards the nearest food in sight, never straight into a body,
+        # otherwise mostly straight on
+        head = snake.get_head_position()
+        options = [direction for direction in DIRECTIONS
+                   if direction != (-snake.direction[0], -snake.direction[1])
+                   and self.bodies.get(self.wrap(head, direction)) is None]
+        if not options:
+            return snake.direction
+        
+        nearest, best = None, None
+        for cell, _ in self.food.query(head[0] - ARENA_SIGHT, head[1] - ARENA_SIGHT,
+                                       ARENA_SIGHT * 2 + 1, ARENA_SIGHT * 2 + 1):
+            distance = self.distance(head, cell)
+            if best is None or distance < best:
+                nearest, best = cell, distance
+        if nearest is not None:
+            return min(options, key=lambda direction: self.distance(self.wrap(head, direction), nearest))
+        if snake.direction in options and random.random() > 0.1:
+            return snake.direction
+        return random.choice(options)
+    
+    def distance(self, a, b):
+        dx = abs(a[0] - b[0])
+        dy = abs(a[1] - b[1])
+        return min(dx, self.width - dx) + min(dy, self.height - dy)
+    
+    def tick(self):
+        # One move of every snake. Returns the snakes that died.
+        self.ticks += 1
+        moving = [snake for snake in self.snakes if snake.is_alive]
+        for snake in moving:
+            if not snake.human:
+                snake.change_direction(self.steer(snake))
+        
+        # Everyone moves at once: collisions are with the bodies as they
+        # were (tails included, as in Snake.update) and between new heads
+        heads = {}
+        for snake in moving:
+            heads.setdefault(self.wrap(snake.get_head_position(), snake.direction), []).append(snake)
+        dead = []
+        for cell, snakes in heads.items():
+            if len(snakes) > 1 or self.bodies.get(cell) is not None:
+                dead.extend(snakes)
+        for snake in dead:
+            self.kill(snake)
+        
+        for cell, snakes in heads.items():
+            snake = snakes[0]
+            if not snake.is_alive:
+                continue
+            snake.moves += 1
+            snake.positions.appendleft(cell)
+            self.bodies.add(cell, snake)
+            if len(snake.positions) > snake.grow_to:
+                self.bodies.remove(snake.positions.pop())
+            if self.food.get(cell) is not None:
+                self.food.remove(cell)
+                snake.grow()
+                if len(self.food) < self.food_count:
+                    self.place_food()
+        
+        # AI snakes come back after a while; human ones when the player wants
+        for snake in self.snakes:
+            if not snake.is_alive and not snake.human and snake.respawn_tick <= self.ticks:
+                self.spawn(snake)
+        return dead
+    
+    def kill(self, snake):
+        # The body turns into food, every other cell of it
+        snake.is_alive = False
+        snake.respawn_tick = self.ticks + ARENA_RESPAWN_TICKS
+        for i, cell in enumerate(snake.positions):
+            self.bodies.remove(cell)
+            if i % 2 and self.food.get(cell) is None:
+                self.food.add(cell, True)
+
+class ArenaView(WorldView):
+    # WorldView's camera over an Arena; the visible cells come from the
+    # arena's indexes, in each snake's colour
+    def __init__(self, arena):
+        super().__init__(arena)
+        self.arena = arena
+        self.color_tiles = {}
+        self.tick = None  # arena tick when last drawn
+    
+    def tile(self, color):
+        tile = self.color_tiles.get(color)
+        if tile is None:
+            tile = self.tiles[FOOD].copy()
+            tile.fill(color)
+            pygame.draw.rect(tile, BLACK, tile.get_rect(), 1)
+            self.color_tiles[color] = tile
+        return tile
+    
+    def draw(self, surface, snake):
+        # snake: the one the camera follows
+        if not self.full_redraw and self.arena.ticks == self.tick:
+            return []
+        if self.background is None:
+            self.render()
+        self.full_redraw = False
+        self.tick = self.arena.ticks
+        
+        if snake.positions:
+            self.follow(snake.get_head_position())
+        surface.blit(self.background, (0, 0))
+        blits = []
+        for cell, owner in self.arena.bodies.query(self.left, self.top, GRID_WIDTH, GRID_HEIGHT):
+            position = (((cell[0] - self.left) % self.arena.width) * GRID_SIZE,
+                        ((cell[1] - self.top) % self.arena.height) * GRID_SIZE)
+            color = owner.color if cell != owner.positions[0] else WHITE
+            blits.append((self.tile(color), position))
+        for cell, _ in self.arena.food.query(self.left, self.top, GRID_WIDTH, GRID_HEIGHT):
+            blits.append((self.tiles[FOOD], (((cell[0] - self.left) % self.arena.width) * GRID_SIZE,
+                                              ((cell[1] - self.top) % self.arena.height) * GRID_SIZE)))
+        surface.blits(blits, False)
+        
+        alive = sum(1 for other in self.arena.snakes if other.is_alive)
+        rank = 1 + sum(1 for other in self.arena.snakes if other.score > snake.score)
+        hud = f"Score: {snake.score}   Rank: {rank}/{len(self.arena.snakes)}   Alive: {alive}"
+        surface.blit(render_text(font_small, hud, True, WHITE), (10, 10))
+        return None
+
+def benchmark_arena(counts=(10, 50, 100, 200, 500), ticks=500, size=(400, 300)):
+    # Arena tick cost against the number of (AI) snakes on one large board
+    for count in counts:
+        arena = Arena(size[0], size[1], count)
+        for _ in range(100):  # let the snakes grow a bit first
+            arena.tick()
+        start = time.perf_counter()
+        for _ in range(ticks):
+            arena.tick()
+        elapsed = time.perf_counter() - start
+        length = len(arena.bodies) / max(1, sum(1 for snake in arena.snakes if snake.is_alive))
+        print(f"{count:4} snakes: {elapsed / ticks * 1000:6.2f} ms/tick, "
+              f"{elapsed / ticks / count * 1e6:5.1f} us per snake, average length {length:5.1f}")
+
 def draw_menu():
     screen.fill(BLACK)
     
     # Draw title
-    title = font_large.render("RETRO SNAKE", True, GREEN)
+    title = render_text(font_large, "RETRO SNAKE", True, GREEN)
     title_rect = title.get_rect(center=(WIDTH//2, HEIGHT//4))
     screen.blit(title, title_rect)
     
@@ -124,110 +861,299 @@ def draw_menu():
     ]
     
     for i, line in enumerate(instructions):
-        text = font_medium.render(line, True, WHITE)
+        text = render_text(font_medium, line, True, WHITE)
         text_rect = text.get_rect(center=(WIDTH//2, HEIGHT//2 + i * 40))
         screen.blit(text, text_rect)
 
-def draw_game_over(score):
+def draw_game_over(score, won=False):
     overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
     overlay.fill((0, 0, 0, 180))  # Semi-transparent black
     screen.blit(overlay, (0, 0))
     
     # Draw game over message
-    game_over = font_large.render("GAME OVER", True, RED)
+    game_over = render_text(font_large, "YOU WIN!" if won else "GAME OVER", True, GREEN if won else RED)
     game_over_rect = game_over.get_rect(center=(WIDTH//2, HEIGHT//3))
     screen.blit(game_over, game_over_rect)
     
     # Draw score
-    score_text = font_medium.render(f"Final Score: {score}", True, WHITE)
+    score_text = render_text(font_medium, f"Final Score: {score}", True, WHITE)
     score_rect = score_text.get_rect(center=(WIDTH//2, HEIGHT//2))
     screen.blit(score_text, score_rect)
     
     # Draw restart instructions
-    restart = font_medium.render("Press R to restart", True, WHITE)
+    restart = render_text(font_medium, "Press R to restart", True, WHITE)
     restart_rect = restart.get_rect(center=(WIDTH//2, HEIGHT//2 + 60))
     screen.blit(restart, restart_rect)
     
-    quit_text = font_medium.render("Press ESC to quit", True, WHITE)
+    quit_text = render_text(font_medium, "Press ESC to quit", True, WHITE)
     quit_rect = quit_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 120))
     screen.blit(quit_text, quit_rect)
 
-def main():
-    clock = pygame.time.Clock()
-    snake = Snake()
-    food = Food(snake.positions)
+def init_display():
+    global screen
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    return screen
+
+class SnakeScene(Scene):
+    caption = "Retro Snake"
     
-    game_state = "menu"  # menu, playing, game_over
+    def __init__(self):
+        super().__init__()
+        self.snake = Snake()
+        self.food = Food(self.snake.free_cells)
+        self.move_timer = 0
+        self.turns = deque()  # queued directions, one is taken per move
+        self.board = Board()
+        self.game_over_drawn = False
+        
+        self.game_state = "menu"  # menu, playing, game_over
     
-    running = True
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    running = False
-                
-                if game_state == "menu":
-                    if event.key == pygame.K_SPACE:
-                        game_state = "playing"
-                        snake = Snake()
-                        food = Food(snake.positions)
-                
-                elif game_state == "playing":
-                    if event.key == pygame.K_UP:
-                        snake.change_direction(UP)
-                    elif event.key == pygame.K_DOWN:
-                        snake.change_direction(DOWN)
-                    elif event.key == pygame.K_LEFT:
-                        snake.change_direction(LEFT)
-                    elif event.key == pygame.K_RIGHT:
-                        snake.change_direction(RIGHT)
-                
-                elif game_state == "game_over":
-                    if event.key == pygame.K_r:
-                        game_state = "playing"
-                        snake = Snake()
-                        food = Food(snake.positions)
-        
-        if game_state == "menu":
+    @property
+    def speed(self):
+        # Moves per second, based on snake length
+        return 5 + min(15, self.snake.score // 5)  # Increase speed as score increases
+    
+    def enter(self, surface):
+        global screen
+        screen = surface
+        super().enter(surface)
+    
+    def new_game(self):
+        self.reset_play()
+        self.snake = Snake()
+        self.food = Food(self.snake.free_cells)
+    
+    def reset_play(self):
+        # Start of every game, whatever it is played on
+        self.game_state = "playing"
+        self.move_timer = 0
+        self.turns.clear()
+        self.game_over_drawn = False
+    
+    def invalidate(self):
+        self.board.invalidate()
+        self.game_over_drawn = False
+    
+    def queue_turn(self, direction):
+        # Keys are read every frame but the snake only turns when it moves,
+        # so quick presses (up then left to double back) wait their turn
+        # instead of overwriting each other. Each is checked against the
+        # direction the snake will have when it gets there.
+        heading = self.turns[-1] if self.turns else self.snake.direction
+        if direction == heading or direction == (-heading[0], -heading[1]):
+            return
+        if len(self.turns) < TURN_BUFFER:
+            self.turns.append(direction)
+    
+    def next_turn(self):
+        # Direction for the coming move, None to keep going straight.
+        # Overridden by the autopilot's attract mode.
+        return self.turns.popleft() if self.turns else None
+    
+    def move_snake(self):
+        # One move of the snake
+        self.food = step_snake(self.snake, self.food)
+    
+    def handle_event(self, event):
+        if event.type != pygame.KEYDOWN:
+            return
+        
+        if event.key == pygame.K_ESCAPE:
+            self.running = False
+        
+        if self.game_state == "menu":
+            if event.key == pygame.K_SPACE:
+                self.new_game()
+        
+        elif self.game_state == "playing":
+            if event.key in KEY_DIRECTIONS:
+                self.queue_turn(KEY_DIRECTIONS[event.key])
+        
+        elif self.game_state == "game_over":
+            if event.key == pygame.K_r:
+                self.new_game()
+    
+    def update(self, dt):
+        if self.game_state != "playing":
+            return
+        
+        # The snake moves on its own timer; the remainder carries over
+        self.move_timer += dt
+        move_interval = 1 / self.speed
+        if self.move_timer < move_interval:
+            return
+        self.move_timer -= move_interval
+        
+        turn = self.next_turn()
+        if turn is not None:
+            self.snake.change_direction(turn)
+        self.move_snake()
+        
+        # Check for game over
+        if not self.snake.is_alive or self.snake.won:
+            self.game_state = "game_over"
+    
+    def draw(self, surface, alpha=1.0):
+        # The snake moves a whole cell at a time, so there is nothing to interpolate
+        if self.game_state == "menu":
             draw_menu()
         
-        elif game_state == "playing":
-            # Update game state
-            snake.update()
-            
-            # Check for food collision
-            if snake.get_head_position() == food.position:
-                snake.grow()
-                food = Food(snake.positions)
-            
-            # Check for game over
-            if not snake.is_alive:
-                game_state = "game_over"
-            
-            # Draw everything
-            screen.fill(BLACK)
-            draw_grid(screen)
-            snake.draw(screen)
-            food.draw(screen)
-            
-            # Draw score
-            score_text = font_small.render(f"Score: {snake.score}", True, WHITE)
-            screen.blit(score_text, (10, 10))
+        elif self.game_state == "playing":
+            return self.board.draw(surface, self.snake, self.food)
         
-        elif game_state == "game_over":
-            draw_game_over(snake.score)
+        elif self.game_state == "game_over":
+            # Overlay the final board once; nothing changes after that
+            if self.game_over_drawn:
+                return []
+            self.board.redraw(surface, self.snake, self.food)
+            draw_game_over(self.snake.score, self.snake.won)
+            self.game_over_drawn = True
+
+class WorldScene(SnakeScene):
+    # The game on a World bigger than the window (--world)
+    caption = "Retro Snake (large world)"
+    
+    def __init__(self, width, height):
+        super().__init__()
+        self.world_size = (width, height)
+        self.world = None
+        self.view = None
+    
+    def new_game(self):
+        self.reset_play()
+        self.world = World(*self.world_size)
+        self.snake = WorldSnake(self.world)
+        self.food = None  # the world holds the food
+        self.view = WorldView(self.world)
+        self.view.center_on(self.snake.get_head_position())
+    
+    def move_snake(self):
+        self.snake.update()
+    
+    def invalidate(self):
+        super().invalidate()
+        if self.view is not None:
+            self.view.invalidate()
+    
+    def draw(self, surface, alpha=1.0):
+        if self.game_state == "menu":
+            draw_menu()
         
-        pygame.display.flip()
+        elif self.game_state == "playing":
+            return self.view.draw(surface, self.snake)
         
-        # Control game speed based on snake length
-        speed = 5 + min(15, snake.score // 5)  # Increase speed as score increases
-        clock.tick(speed)
+        elif self.game_state == "game_over":
+            if self.game_over_drawn:
+                return []
+            self.view.invalidate()
+            self.view.draw(surface, self.snake)
+            draw_game_over(self.snake.score, self.snake.won)
+            self.game_over_drawn = True
+
+class ArenaScene(WorldScene):
+    # The player's snake among AI ones in an Arena (--arena); with watch,
+    # only AI snakes and the camera follows one of the leaders
+    caption = "Retro Snake (arena)"
+    
+    def __init__(self, snakes, width, height, watch=False):
+        super().__init__(width, height)
+        self.snake_count = snakes
+        self.watch = watch
+        self.arena = None
+    
+    def new_game(self):
+        self.reset_play()
+        self.food = None  # the arena holds the food
+        if self.watch:
+            self.arena = Arena(*self.world_size, self.snake_count)
+        else:
+            self.arena = Arena(*self.world_size, self.snake_count + 1, humans=1)
+        self.snake = self.arena.snakes[0]
+        self.view = ArenaView(self.arena)
+        if self.snake.positions:
+            self.view.center_on(self.snake.get_head_position())
+    
+    @property
+    def speed(self):
+        # Every snake moves at this rate, so it can't depend on the one
+        # the camera happens to follow
+        return ARENA_SPEED
+    
+    def move_snake(self):
+        self.arena.tick()
+        if self.watch and not self.snake.is_alive:
+            alive = [snake for snake in self.arena.snakes if snake.is_alive]
+            if alive:
+                self.snake = max(alive, key=lambda snake: snake.score)
+
+def main(world=None, arena=None, watch=False):
+    if arena:
+        scene = ArenaScene(arena, *(world or ARENA_SIZE), watch)
+    else:
+        scene = WorldScene(*world) if world else SnakeScene()
+    run_scene(scene, init_display())
     
     pygame.quit()
     sys.exit()
 
+def run_headless(games):
+    start = time.perf_counter()
+    results = simulate(games)
+    elapsed = time.perf_counter() - start
+    
+    steps = sum(result[1] for result in results)
+    average_score = sum(result[0] for result in results) / games
+    print(f"{games} games, average score {average_score:.1f}")
+    print(f"{steps} steps in {elapsed:.2f}s ({steps / elapsed:,.0f} steps/s)")
+
+def world_size(text):
+    # "WIDTHxHEIGHT" in cells, at least as big as the window
+    try:
+        width, height = (int(value) for value in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {text!r}")
+    if width < GRID_WIDTH or height < GRID_HEIGHT:
+        raise argparse.ArgumentTypeError(f"a world must be at least {GRID_WIDTH}x{GRID_HEIGHT} cells")
+    return width, height
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Retro Snake")
+    parser.add_argument("--headless", action="store_true",
+                        help="simulate games without a window and report speed")
+    parser.add_argument("--games", type=int, default=100,
+                        help="games to simulate with --headless")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="measure the cost of a tick at snake lengths up to a full board, "
+                             "in large worlds and in arenas")
+    parser.add_argument("--world", type=world_size, metavar="WxH",
+                        help="play on a scrolling world of WxH cells, e.g. 2000x2000 "
+                             f"(with --arena: the arena's size, default {ARENA_SIZE[0]}x{ARENA_SIZE[1]})")
+    parser.add_argument("--arena", type=int, metavar="SNAKES",
+                        help="play in an arena against SNAKES AI snakes")
+    parser.add_argument("--watch", action="store_true",
+                        help="with --arena: only AI snakes, the camera follows a leader")
+    add_frame_stats_args(parser)
+    args = parser.parse_args()
+    
+    if args.arena is not None:
+        width, height = args.world or ARENA_SIZE
+        snakes = args.arena if args.watch else args.arena + 1  # plus the player's
+        if args.arena < 1:
+            parser.error("--arena needs at least one AI snake")
+        if snakes * ARENA_CELLS_PER_SNAKE > width * height:
+            parser.error(f"a {width}x{height} arena holds at most "
+                         f"{width * height // ARENA_CELLS_PER_SNAKE} snakes")
+    return args
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.benchmark:
+        benchmark_ticks()
+        benchmark_world()
+        benchmark_arena()
+    elif args.headless:
+        enable_headless()
+        run_headless(args.games)
+    else:
+        apply_frame_stats_args(args)
+        main(args.world, args.arena, args.watch)
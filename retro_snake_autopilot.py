@@ -0,0 +1,374 @@
+import sys
+import time
+import heapq
+import random
+import argparse
+from collections import deque
+
+import pygame
+
+from retro_engine import run_scene, enable_headless, add_frame_stats_args, apply_frame_stats_args
+from retro_snake import (GRID_WIDTH, GRID_HEIGHT, DIRECTIONS, Snake, Food, SnakeScene,
+                         step_snake, board_cycle, init_display)
+
+# Autopilots for Snake. Each strategy is a policy(snake, food) -> direction,
+# so it drives simulate() headless or SnakeScene on screen:
+#   greedy  shortest path to the food (BFS), any free cell when there is none
+#   astar   A* to the food, but only if the tail can still be reached from
+#           where the snake ends up; otherwise it chases its own tail
+#   cycle   follows a Hamiltonian cycle of the board, taking shortcuts that
+#           can't trap it, so it always fills the board in the end
+#
+# Path searches know the body moves on: a body cell can be entered once the
+# tail has left it (the tail cell itself only a move later, see Snake.update).
+# A pilot given a budget gives up on the food when the search for it runs
+# over and makes a safe move instead, so a decision can't hold up a frame.
+
+STALL_LIMIT = GRID_WIDTH * GRID_HEIGHT * 2  # moves without food before a benchmark game counts as stuck
+SHORTCUT_MARGIN = 4  # free cells the cycle pilot keeps in front of its tail
+SHORTCUT_COVER = 0.5  # share of the board after which it takes no more shortcuts
+ATTRACT_SPEED = 30  # moves per second in attract mode
+ATTRACT_RESTART = 3.0  # seconds the final board stays up before the next demo game
+ATTRACT_BUDGET = 0.004  # seconds a demo move may search, well inside a 60 fps frame
+
+# Every cell's neighbours as (direction, cell); the board wraps around
+STEPS = {(x, y): [(d, ((x + d[0]) % GRID_WIDTH, (y + d[1]) % GRID_HEIGHT)) for d in DIRECTIONS]
+         for y in range(GRID_HEIGHT) for x in range(GRID_WIDTH)}
+
+def reverse(direction):
+    return (-direction[0], -direction[1])
+
+def free_times(positions, pending):
+    # Moves after which each body cell is free again (positions head first;
+    # pending: growth still to come, which keeps the tail in place)
+    length = len(positions)
+    return {cell: length - i + pending for i, cell in enumerate(positions)}
+
+def distance(a, b):
+    # Moves between two cells on the wrapping board, ignoring the body
+    dx = abs(a[0] - b[0])
+    dy = abs(a[1] - b[1])
+    return min(dx, GRID_WIDTH - dx) + min(dy, GRID_HEIGHT - dy)
+
+def rebuild_path(parents, cell):
+    path = []
+    while parents[cell] is not None:
+        path.append(cell)
+        cell = parents[cell]
+    path.reverse()
+    return path
+
+def out_of_time(deadline):
+    return deadline is not None and time.perf_counter() > deadline
+
+def bfs_path(start, goal, positions, pending, forbidden=None, deadline=None):
+    # Shortest route from start to goal as the cells after start, or None.
+    # forbidden: a direction the first move can't take (the snake's reverse).
+    # Also None if the search is still going at deadline (a perf_counter time).
+    blocked = free_times(positions, pending)
+    parents = {start: None}
+    frontier = deque([(start, 0)])
+    while frontier:
+        if out_of_time(deadline):
+            return None
+        cell, moves = frontier.popleft()
+        for direction, nxt in STEPS[cell]:
+            if nxt in parents or blocked.get(nxt, 0) > moves:
+                continue
+            if moves == 0 and direction == forbidden:
+                continue
+            parents[nxt] = cell
+            if nxt == goal:
+                return rebuild_path(parents, nxt)
+            frontier.append((nxt, moves + 1))
+    return None
+
+def astar_path(start, goal, positions, pending, forbidden=None, deadline=None):
+    # bfs_path, searching towards the goal first. The estimate is the
+    # distance() to the goal, looked up per column and row.
+    blocked = free_times(positions, pending)
+    to_column = [min(abs(x - goal[0]), GRID_WIDTH - abs(x - goal[0])) for x in range(GRID_WIDTH)]
+    to_row = [min(abs(y - goal[1]), GRID_HEIGHT - abs(y - goal[1])) for y in range(GRID_HEIGHT)]
+    parents = {start: None}
+    moves_to = {start: 0}
+    frontier = [(distance(start, goal), 0, start)]
+    while frontier:
+        if out_of_time(deadline):
+            return None
+        _, moves, cell = heapq.heappop(frontier)
+        if cell == goal:
+            return rebuild_path(parents, cell)
+        if moves > moves_to[cell]:
+            continue  # stale entry
+        for direction, nxt in STEPS[cell]:
+            if blocked.get(nxt, 0) > moves or moves + 1 >= moves_to.get(nxt, moves + 2):
+                continue
+            if moves == 0 and direction == forbidden:
+                continue
+            parents[nxt] = cell
+            moves_to[nxt] = moves + 1
+            heapq.heappush(frontier, (moves + 1 + to_column[nxt[0]] + to_row[nxt[1]], moves + 1, nxt))
+    return None
+
+def open_space(start, positions, pending):
+    # Cells reachable from start, for choosing between bad options
+    blocked = free_times(positions, pending)
+    seen = {start}
+    frontier = deque([(start, 0)])
+    while frontier:
+        cell, moves = frontier.popleft()
+        for _, nxt in STEPS[cell]:
+            if nxt not in seen and blocked.get(nxt, 0) <= moves:
+                seen.add(nxt)
+                frontier.append((nxt, moves + 1))
+    return len(seen)
+
+def after_moves(snake, path, eats):
+    # The body (head first) and pending growth once the snake has followed path
+    body = list(reversed(path)) + list(snake.positions)
+    length = min(len(snake.positions) + len(path), snake.grow_to)
+    return body[:length], snake.grow_to + eats - length
+
+def direction_to(cell, nxt):
+    for direction, neighbour in STEPS[cell]:
+        if neighbour == nxt:
+            return direction
+    raise ValueError(f"{nxt} is not next to {cell}")
+
+class Autopilot:
+    # Base for the strategies. make_plan() returns the cells to move through
+    # (None if it has no plan); the plan is followed as long as the snake
+    # does and the food stays put, so a route is searched once per food.
+    # budget: seconds a move may spend searching, None for no limit. Only
+    # the search for the food is cut short; a pilot that has run over still
+    # looks for one safe move.
+    name = "autopilot"
+    
+    def __init__(self, budget=None):
+        self.budget = budget
+        self.deadline = None
+        self.plan = deque()
+        self.snake = None
+        self.food = None
+        self.moves = 0
+    
+    def __call__(self, snake, food):
+        head = snake.get_head_position()
+        if self.budget is not None:
+            self.deadline = time.perf_counter() + self.budget
+        if not (self.plan and snake is self.snake and snake.moves == self.moves
+                and food.position == self.food):
+            self.plan = deque(self.make_plan(snake, food) or ())
+            self.snake = snake
+            self.food = food.position
+        self.moves = snake.moves + 1
+        
+        nxt = self.plan.popleft() if self.plan else self.fallback(snake, food)
+        return snake.direction if nxt is None else direction_to(head, nxt)
+    
+    def safe_moves(self, snake):
+        # Neighbours the snake can enter on its next move, straight ahead first
+        head = snake.get_head_position()
+        cells = [cell for direction, cell in STEPS[head]
+                 if direction != reverse(snake.direction) and cell not in snake.occupied]
+        cells.sort(key=lambda cell: direction_to(head, cell) != snake.direction)
+        return cells
+    
+    def make_plan(self, snake, food):
+        return None
+    
+    def fallback(self, snake, food):
+        # Any move that isn't fatal right away
+        cells = self.safe_moves(snake)
+        return cells[0] if cells else None
+
+class GreedyPilot(Autopilot):
+    name = "greedy"
+    
+    def make_plan(self, snake, food):
+        return bfs_path(snake.get_head_position(), food.position, snake.positions,
+                        snake.grow_to - len(snake.positions), reverse(snake.direction),
+                        self.deadline)
+
+class SafePilot(Autopilot):
+    name = "astar"
+    
+    def make_plan(self, snake, food):
+        path = astar_path(snake.get_head_position(), food.position, snake.positions,
+                          snake.grow_to - len(snake.positions), reverse(snake.direction),
+                          self.deadline)
+        if path is not None:
+            # Only take the food if the snake can still follow its tail from there
+            body, pending = after_moves(snake, path, True)
+            if len(body) == 1 or bfs_path(body[0], body[-1], body, pending,
+                                          deadline=self.deadline) is not None:
+                return path
+        return self.chase_tail(snake, food)
+    
+    def chase_tail(self, snake, food):
+        # One move towards the tail, the long way round to buy time for the
+        # food to become reachable. Checked again every move: a route to
+        # where the tail is now doesn't stay safe for long.
+        best, best_length = None, -1
+        for cell in self.safe_moves(snake):
+            if best is not None and out_of_time(self.deadline):
+                break  # a safe move is enough once the budget is spent
+            body, pending = after_moves(snake, [cell], cell == food.position)
+            path = bfs_path(cell, body[-1], body, pending) if len(body) > 1 else []
+            if path is not None and len(path) > best_length:
+                best, best_length = cell, len(path)
+        return [best] if best is not None else None
+    
+    def fallback(self, snake, food):
+        # Trapped: head for the most open space
+        cells = self.safe_moves(snake)
+        if not cells:
+            return None
+        return max(cells, key=lambda cell: open_space(cell, *after_moves(snake, [cell], False)))
+
+class CyclePilot(Autopilot):
+    # The snake's body always lies on the cycle between its tail and its
+    # head, in cycle order. A shortcut skips part of the free stretch ahead
+    # of the head, so it keeps that order as long as it neither passes the
+    # food nor gets too close to the tail. The skipped cells are only free
+    # again once the tail has passed them, so the long snake that fills the
+    # last cells sticks to the cycle.
+    name = "cycle"
+    
+    def __init__(self, budget=None):
+        super().__init__(budget)
+        cycle = board_cycle()
+        self.size = len(cycle)
+        self.order = {cell: i for i, cell in enumerate(cycle)}
+    
+    def ahead(self, a, b):
+        # Moves from a to b along the cycle
+        return (self.order[b] - self.order[a]) % self.size
+    
+    def make_plan(self, snake, food):
+        head = snake.get_head_position()
+        room = self.ahead(head, snake.positions[-1]) if len(snake.positions) > 1 else self.size
+        limit = room - (snake.grow_to - len(snake.positions)) - SHORTCUT_MARGIN
+        if len(snake.positions) >= self.size * SHORTCUT_COVER:
+            limit = 2
+        target = self.ahead(head, food.position)
+        
+        # The furthest jump that's allowed; otherwise the next cell of the
+        # cycle (on the very first move that can be behind the snake, which
+        # can't turn back, so take the nearest cell ahead instead)
+        cells = self.safe_moves(snake)
+        shortcuts = [cell for cell in cells if self.ahead(head, cell) <= target
+                     and self.ahead(head, cell) < limit]
+        if shortcuts:
+            return [max(shortcuts, key=lambda cell: self.ahead(head, cell))]
+        return [min(cells, key=lambda cell: self.ahead(head, cell))] if cells else None
+
+STRATEGIES = {pilot.name: pilot for pilot in (GreedyPilot, SafePilot, CyclePilot)}
+
+def run_game(pilot, stall_limit=STALL_LIMIT):
+    # One headless game. Returns (snake, moves, seconds spent in the pilot,
+    # slowest single decision, how it ended)
+    snake = Snake()
+    food = Food(snake.free_cells)
+    moves = 0
+    since_food = 0
+    thinking = 0
+    slowest = 0
+    while snake.is_alive and not snake.won and since_food < stall_limit:
+        start = time.perf_counter()
+        direction = pilot(snake, food)
+        elapsed = time.perf_counter() - start
+        thinking += elapsed
+        slowest = max(slowest, elapsed)
+        
+        score = snake.score
+        snake.change_direction(direction)
+        food = step_snake(snake, food)
+        moves += 1
+        since_food = 0 if snake.score != score else since_food + 1
+    
+    outcome = "won" if snake.won else ("died" if not snake.is_alive else "stuck")
+    return snake, moves, thinking, slowest, outcome
+
+def run_benchmark(strategies, games, seed=None, budget=None):
+    if seed is not None:
+        random.seed(seed)
+    print(f"{'strategy':<8} {'games':>5} {'length':>7} {'won':>4} {'died':>4} {'stuck':>5} "
+          f"{'moves/food':>10} {'us/move':>8} {'worst ms':>8}")
+    for name in strategies:
+        pilot = STRATEGIES[name](budget)
+        lengths = []
+        outcomes = {"won": 0, "died": 0, "stuck": 0}
+        moves = 0
+        food = 0
+        thinking = 0
+        slowest = 0
+        for _ in range(games):
+            snake, game_moves, game_thinking, game_slowest, outcome = run_game(pilot)
+            lengths.append(len(snake.positions))
+            outcomes[outcome] += 1
+            moves += game_moves
+            food += snake.score
+            thinking += game_thinking
+            slowest = max(slowest, game_slowest)
+        print(f"{name:<8} {games:>5} {sum(lengths) / games:>7.1f} {outcomes['won']:>4} "
+              f"{outcomes['died']:>4} {outcomes['stuck']:>5} {moves / max(food, 1):>10.1f} "
+              f"{thinking / moves * 1e6:>8.1f} {slowest * 1000:>8.2f}")
+
+class AttractScene(SnakeScene):
+    # Demo loop: the autopilot plays, the final board stays up for a moment
+    # and a new game starts. ESC quits.
+    caption = "Retro Snake (demo)"
+    
+    def __init__(self, pilot):
+        super().__init__()
+        self.pilot = pilot
+        self.restart_timer = 0
+        self.new_game()
+    
+    @property
+    def speed(self):
+        return ATTRACT_SPEED
+    
+    def next_turn(self):
+        return self.pilot(self.snake, self.food)
+    
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            self.running = False
+    
+    def update(self, dt):
+        if self.game_state == "game_over":
+            self.restart_timer += dt
+            if self.restart_timer >= ATTRACT_RESTART:
+                self.restart_timer = 0
+                self.new_game()
+            return
+        super().update(dt)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Snake autopilots: benchmark or attract-mode demo")
+    parser.add_argument("--strategy", action="append", choices=sorted(STRATEGIES),
+                        help="strategy to run (repeatable; default: all of them)")
+    parser.add_argument("--games", type=int, default=3, help="games per strategy")
+    parser.add_argument("--seed", type=int, help="random seed for reproducible food placement")
+    parser.add_argument("--budget", type=float, metavar="MS",
+                        help="time per move the benchmark may spend searching for the food (default: unlimited; "
+                             f"attract mode always uses {ATTRACT_BUDGET * 1000:g} ms)")
+    parser.add_argument("--attract", action="store_true",
+                        help="play the (first) strategy in a window instead of benchmarking")
+    add_frame_stats_args(parser)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    strategies = args.strategy or list(STRATEGIES)
+    if args.attract:
+        apply_frame_stats_args(args)
+        run_scene(AttractScene(STRATEGIES[strategies[0]](ATTRACT_BUDGET)), init_display())
+        pygame.quit()
+        sys.exit()
+    else:
+        enable_headless()
+        budget = args.budget / 1000 if args.budget is not None else None
+        run_benchmark(strategies, args.games, args.seed, budget)
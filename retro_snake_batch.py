@@ -0,0 +1,192 @@
+import numpy as np
+import time
+import random
+import argparse
+
+from retro_snake import GRID_WIDTH, GRID_HEIGHT, DIRECTIONS, MAX_GAME_STEPS, Snake, Food, step_snake
+
+# Batched Snake environments for training agents: thousands of games stepped
+# together, one NumPy operation per rule instead of one Snake.update call per
+# game. The rules are those of retro_snake's Snake and step_snake (wrapping
+# board, no reversing, the tail counts as body, +1 length per food), so
+# agents trained here play the real game.
+#
+# Actions are indices into retro_snake.DIRECTIONS (up, down, left, right).
+# The observation is one byte per cell: EMPTY, BODY, HEAD or FOOD.
+
+EMPTY, BODY, HEAD, FOOD = 0, 1, 2, 3
+REWARD_FOOD = 1.0
+REWARD_DEATH = -1.0
+FOOD_TRIES = 16  # random picks per food before searching the free cells
+
+DX = np.array([direction[0] for direction in DIRECTIONS], dtype=np.int32)
+DY = np.array([direction[1] for direction in DIRECTIONS], dtype=np.int32)
+OPPOSITE = np.array([DIRECTIONS.index((-x, -y)) for x, y in DIRECTIONS], dtype=np.int32)
+START_DIRECTION = DIRECTIONS.index((1, 0))  # right, as Snake.reset
+
+class BatchSnake:
+    def __init__(self, envs, width=GRID_WIDTH, height=GRID_HEIGHT, seed=None, max_steps=MAX_GAME_STEPS):
+        self.envs = envs
+        self.width = width
+        self.height = height
+        self.cells = width * height
+        self.max_steps = max_steps  # episodes are cut off (done, no penalty) after this many steps
+        self.rng = np.random.default_rng(seed)
+        self.rows = np.arange(envs)
+        
+        # Board of every env, flat; observation is the same memory as (envs, height, width)
+        self.grid = np.zeros((envs, self.cells), dtype=np.uint8)
+        self.observation = self.grid.reshape(envs, height, width)
+        
+        # Body of every env as a ring buffer of cell indices: the head is at
+        # ring[head_slot], the tail length - 1 slots before it
+        self.ring = np.zeros((envs, self.cells), dtype=np.int32)
+        self.head_slot = np.zeros(envs, dtype=np.int32)
+        self.length = np.zeros(envs, dtype=np.int32)
+        self.grow_to = np.zeros(envs, dtype=np.int32)
+        self.head_x = np.zeros(envs, dtype=np.int32)
+        self.head_y = np.zeros(envs, dtype=np.int32)
+        self.direction = np.zeros(envs, dtype=np.int32)
+        self.food = np.zeros(envs, dtype=np.int32)  # cell index, -1 once the board is full
+        self.score = np.zeros(envs, dtype=np.int32)
+        self.steps = np.zeros(envs, dtype=np.int32)
+        
+        self.finished_scores = []  # arrays of final scores per step with finished episodes
+        self.reset_envs(self.rows)
+    
+    def reset(self):
+        # Start every env over; returns the observation
+        self.reset_envs(self.rows)
+        return self.observation
+    
+    def reset_envs(self, envs):
+        # New games for the envs in the index array envs
+        head_x, head_y = self.width // 2, self.height // 2
+        head = head_y * self.width + head_x
+        self.grid[envs] = EMPTY
+        self.grid[envs, head] = HEAD
+        self.ring[envs, 0] = head
+        self.head_slot[envs] = 0
+        self.length[envs] = 1
+        self.grow_to[envs] = 3
+        self.head_x[envs] = head_x
+        self.head_y[envs] = head_y
+        self.direction[envs] = START_DIRECTION
+        self.score[envs] = 0
+        self.steps[envs] = 0
+        self.place_food(envs)
+    
+    def place_food(self, envs):
+        # A uniformly random free cell for each env in envs: random picks,
+        # which nearly always land on a free cell, then a search of the free
+        # cells for the few (nearly full) boards left
+        for _ in range(FOOD_TRIES):
+            cells = self.rng.integers(0, self.cells, len(envs), dtype=np.int32)
+            free = self.grid[envs, cells] == EMPTY
+            placed, cells = envs[free], cells[free]
+            self.grid[placed, cells] = FOOD
+            self.food[placed] = cells
+            envs = envs[~free]
+            if not len(envs):
+                return
+        for env in envs:
+            free = np.flatnonzero(self.grid[env] == EMPTY)
+            if len(free):
+                cell = free[self.rng.integers(len(free))]
+                self.grid[env, cell] = FOOD
+                self.food[env] = cell
+            else:
+                self.food[env] = -1
+    
+    def step(self, actions):
+        # Advance every env one move. Returns (observation, rewards, dones);
+        # finished envs are already reset, so the observation shows their new
+        # game. The observation is updated in place: copy it to keep it.
+        rows = self.rows
+        actions = np.asarray(actions, dtype=np.int32)
+        
+        # Turn, except straight back
+        self.direction = np.where(actions == OPPOSITE[self.direction], self.direction, actions)
+        self.head_x = (self.head_x + DX[self.direction]) % self.width
+        self.head_y = (self.head_y + DY[self.direction]) % self.height
+        head = self.head_y * self.width + self.head_x
+        
+        # The tail counts even if it moves on, as in Snake.update
+        target = self.grid[rows, head]
+        dead = target == BODY
+        eats = target == FOOD
+        
+        # Move every snake (the dead ones are reset below): the old head
+        # becomes body, and the tail leaves unless the snake is growing
+        self.grid[rows, self.ring[rows, self.head_slot]] = BODY
+        self.head_slot = (self.head_slot + 1) % self.cells
+        self.ring[rows, self.head_slot] = head
+        growing = self.length < self.grow_to
+        self.length += growing
+        tail = self.ring[rows, (self.head_slot - self.length) % self.cells]
+        self.grid[rows, tail] = np.where(growing, self.grid[rows, tail], EMPTY)
+        self.grid[rows, head] = HEAD
+        
+        # Food: grow by one and put down the next one
+        self.grow_to += eats
+        self.score += eats
+        eaten = np.flatnonzero(eats)
+        if len(eaten):
+            self.place_food(eaten)
+        won = eats & (self.food < 0)
+        
+        self.steps += 1
+        dones = dead | won | (self.steps >= self.max_steps)
+        rewards = eats * np.float32(REWARD_FOOD) + dead * np.float32(REWARD_DEATH)
+        
+        finished = np.flatnonzero(dones)
+        if len(finished):
+            self.finished_scores.append(self.score[finished])
+            self.reset_envs(finished)
+        return self.observation, rewards, dones
+    
+    def episode_scores(self):
+        # Final score of every finished episode so far, as one array
+        if not self.finished_scores:
+            return np.zeros(0, dtype=np.int32)
+        return np.concatenate(self.finished_scores)
+
+def scalar_steps_per_second(steps):
+    # The same random driver on retro_snake's Snake, for comparison
+    snake = Snake()
+    food = Food(snake.free_cells)
+    start = time.perf_counter()
+    for _ in range(steps):
+        snake.change_direction(random.choice(DIRECTIONS))
+        food = step_snake(snake, food)
+        if not snake.is_alive:
+            snake = Snake()
+            food = Food(snake.free_cells)
+    return steps / (time.perf_counter() - start)
+
+def run_benchmark(envs, steps, width, height, seed=None):
+    batch = BatchSnake(envs, width, height, seed)
+    actions = batch.rng.integers(0, len(DIRECTIONS), (steps, envs), dtype=np.int32)
+    start = time.perf_counter()
+    for step_actions in actions:
+        batch.step(step_actions)
+    elapsed = time.perf_counter() - start
+    
+    scores = batch.episode_scores()
+    print(f"{envs} envs on a {width}x{height} board, random actions")
+    print(f"{envs * steps:,} env-steps in {elapsed:.2f}s ({envs * steps / elapsed:,.0f} env-steps/s)")
+    print(f"{len(scores):,} episodes finished, mean score {scores.mean() if len(scores) else 0:.2f}")
+    print(f"retro_snake.Snake one at a time: {scalar_steps_per_second(100000):,.0f} steps/s")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Batched Snake environments")
+    parser.add_argument("--envs", type=int, default=4096, help="environments stepped together")
+    parser.add_argument("--steps", type=int, default=500, help="batch steps to run")
+    parser.add_argument("--width", type=int, default=GRID_WIDTH, help="board width in cells")
+    parser.add_argument("--height", type=int, default=GRID_HEIGHT, help="board height in cells")
+    parser.add_argument("--seed", type=int, help="random seed for a reproducible run")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    run_benchmark(args.envs, args.steps, args.width, args.height, args.seed)
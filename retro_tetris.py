@@ -1,6 +1,11 @@
 import pygame
 import sys
 import random
+import time
+import argparse
+
+from retro_engine import (Scene, run_scene, render_text, enable_headless,
+                          add_frame_stats_args, apply_frame_stats_args)
 
 # Initialize pygame
 pygame.init()
@@ -13,8 +18,10 @@ GRID_HEIGHT = 20
 GRID_OFFSET_X = (WIDTH - GRID_WIDTH * GRID_SIZE) // 2
 GRID_OFFSET_Y = (HEIGHT - GRID_HEIGHT * GRID_SIZE) // 2
 
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Retro Tetris")
+# The board is one int per row with bit x set for a filled cell in column x
+FULL_ROW = (1 << GRID_WIDTH) - 1
+
+screen = None  # Set by init_display() or by the host running TetrisScene
 
 # Colors
 BLACK = (0, 0, 0)
@@ -47,40 +54,60 @@ font_large = pygame.font.SysFont('Arial', 48, bold=True)
 font_medium = pygame.font.SysFont('Arial', 32)
 font_small = pygame.font.SysFont('Arial', 24)
 
+def shape_masks(shape):
+    # Row bitmasks of a shape matrix, bit j for column j
+    return [sum(1 << j for j, cell in enumerate(row) if cell) for row in shape]
+
+def rotate_shape(shape):
+    # Transpose the shape matrix to rotate it
+    return [list(row) for row in zip(*shape[::-1])]
+
+def shape_rotations(shape):
+    # The four (shape, masks) orientations, each a quarter turn from the last
+    rotations = []
+    for _ in range(4):
+        rotations.append((shape, shape_masks(shape)))
+        shape = rotate_shape(shape)
+    return rotations
+
+ROTATIONS = [shape_rotations(shape) for shape in SHAPES]
+
 class Tetromino:
     def __init__(self):
         self.shape_index = random.randint(0, len(SHAPES) - 1)
-        self.shape = SHAPES[self.shape_index]
+        self.rotation = 0
+        self.shape, self.masks = ROTATIONS[self.shape_index][0]
         self.color = SHAPE_COLORS[self.shape_index]
         self.x = GRID_WIDTH // 2 - len(self.shape[0]) // 2
         self.y = 0
     
     def rotate(self):
-        # Transpose the shape matrix to rotate it
-        rotated = list(zip(*self.shape[::-1]))
-        # Convert tuples to lists
-        rotated = [list(row) for row in rotated]
-        return rotated
+        return ROTATIONS[self.shape_index][(self.rotation + 1) % 4][0]
     
-    def try_rotate(self, grid):
-        rotated = self.rotate()
-        if not self.collision(self.x, self.y, rotated, grid):
-            self.shape = rotated
+    def try_rotate(self, rows):
+        rotation = (self.rotation + 1) % 4
+        shape, masks = ROTATIONS[self.shape_index][rotation]
+        if not self.collision(self.x, self.y, masks, rows):
+            self.rotation = rotation
+            self.shape = shape
+            self.masks = masks
     
-    def collision(self, x, y, shape, grid):
-        for i in range(len(shape)):
-            for j in range(len(shape[i])):
-                if shape[i][j]:
-                    if (y + i >= GRID_HEIGHT or 
-                        x + j < 0 or 
-                        x + j >= GRID_WIDTH or 
-                        (y + i >= 0 and grid[y + i][x + j])):
-                        return True
+    def collision(self, x, y, masks, rows):
+        # Shapes fill their leftmost column, so any x < 0 is off the board
+        if x < 0:
+            return True
+        for i, mask in enumerate(masks):
+            mask <<= x
+            # Bits past FULL_ROW are off the right edge
+            if mask > FULL_ROW or y + i >= GRID_HEIGHT or (y + i >= 0 and rows[y + i] & mask):
+                return True
         return False
 
 class Game:
     def __init__(self):
-        self.grid = [[0 for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
+        self.rows = [0] * GRID_HEIGHT
+        # Shape index + 1 per cell, 0 for empty; only read for drawing
+        self.colors = bytearray(GRID_WIDTH * GRID_HEIGHT)
         self.current_piece = Tetromino()
         self.next_piece = Tetromino()
         self.game_over = False
@@ -95,31 +122,36 @@ class Game:
         self.next_piece = Tetromino()
         
         # Check if game is over
-        if self.collision(self.current_piece.x, self.current_piece.y, self.current_piece.shape):
+        if self.collision(self.current_piece.x, self.current_piece.y, self.current_piece.masks):
             self.game_over = True
     
-    def collision(self, x, y, shape):
-        return self.current_piece.collision(x, y, shape, self.grid)
+    def collision(self, x, y, masks):
+        return self.current_piece.collision(x, y, masks, self.rows)
     
     def lock_piece(self):
-        for i in range(len(self.current_piece.shape)):
-            for j in range(len(self.current_piece.shape[i])):
-                if self.current_piece.shape[i][j]:
-                    if self.current_piece.y + i >= 0:  # Only lock if on grid
-                        self.grid[self.current_piece.y + i][self.current_piece.x + j] = self.current_piece.color
+        piece = self.current_piece
+        color = piece.shape_index + 1
+        for i, mask in enumerate(piece.masks):
+            y = piece.y + i
+            if y < 0:  # Only lock if on grid
+                continue
+            self.rows[y] |= mask << piece.x
+            for j, cell in enumerate(piece.shape[i]):
+                if cell:
+                    self.colors[y * GRID_WIDTH + piece.x + j] = color
         
-        self.clear_lines()
+        # Only the rows the piece landed in can have filled up
+        self.clear_lines(max(piece.y, 0), piece.y + len(piece.masks))
         self.new_piece()
     
-    def clear_lines(self):
-        lines_to_clear = []
-        for i in range(GRID_HEIGHT):
-            if all(self.grid[i]):
-                lines_to_clear.append(i)
+    def clear_lines(self, top=0, bottom=GRID_HEIGHT):
+        lines_to_clear = [i for i in range(top, bottom) if self.rows[i] == FULL_ROW]
         
         for line in lines_to_clear:
-            del self.grid[line]
-            self.grid.insert(0, [0 for _ in range(GRID_WIDTH)])
+            del self.rows[line]
+            self.rows.insert(0, 0)
+            del self.colors[line * GRID_WIDTH:(line + 1) * GRID_WIDTH]
+            self.colors[0:0] = bytes(GRID_WIDTH)
         
         # Update score and level
         if lines_to_clear:
@@ -129,15 +161,16 @@ class Game:
             self.fall_speed = max(0.05, 0.5 - (self.level - 1) * 0.05)
     
     def move(self, dx, dy):
-        if not self.collision(self.current_piece.x + dx, self.current_piece.y + dy, self.current_piece.shape):
+        if not self.collision(self.current_piece.x + dx, self.current_piece.y + dy, self.current_piece.masks):
             self.current_piece.x += dx
             self.current_piece.y += dy
             return True
         return False
     
     def drop(self):
-        while self.move(0, 1):
-            pass
+        piece = self.current_piece
+        while not piece.collision(piece.x, piece.y + 1, piece.masks, self.rows):
+            piece.y += 1
         self.lock_piece()
     
     def update(self, dt):
@@ -146,7 +179,8 @@ class Game:
         
         self.fall_timer += dt
         if self.fall_timer >= self.fall_speed:
-            self.fall_timer = 0
+            # Keep the remainder so the fall rate doesn't depend on the step size
+            self.fall_timer -= self.fall_speed
             if not self.move(0, 1):
                 self.lock_piece()
     
@@ -157,9 +191,12 @@ class Game:
         
         # Draw grid cells
         for y in range(GRID_HEIGHT):
+            if not self.rows[y]:
+                continue
             for x in range(GRID_WIDTH):
-                if self.grid[y][x]:
-                    pygame.draw.rect(surface, self.grid[y][x], 
+                color = self.colors[y * GRID_WIDTH + x]
+                if color:
+                    pygame.draw.rect(surface, SHAPE_COLORS[color - 1], 
                                     (GRID_OFFSET_X + x * GRID_SIZE, GRID_OFFSET_Y + y * GRID_SIZE, 
                                      GRID_SIZE - 1, GRID_SIZE - 1))
         
@@ -178,7 +215,7 @@ class Game:
         next_piece_y = 100
         
         # Draw next piece label
-        next_label = font_small.render("NEXT:", True, WHITE)
+        next_label = render_text(font_small, "NEXT:", True, WHITE)
         surface.blit(next_label, (next_piece_x, next_piece_y - 30))
         
         # Draw next piece
@@ -191,9 +228,9 @@ class Game:
                                      GRID_SIZE - 1, GRID_SIZE - 1))
         
         # Draw score and level
-        score_text = font_small.render(f"SCORE: {self.score}", True, WHITE)
-        level_text = font_small.render(f"LEVEL: {self.level}", True, WHITE)
-        lines_text = font_small.render(f"LINES: {self.lines_cleared}", True, WHITE)
+        score_text = render_text(font_small, f"SCORE: {self.score}", True, WHITE)
+        level_text = render_text(font_small, f"LEVEL: {self.level}", True, WHITE)
+        lines_text = render_text(font_small, f"LINES: {self.lines_cleared}", True, WHITE)
         
         surface.blit(score_text, (50, 100))
         surface.blit(level_text, (50, 140))
@@ -201,19 +238,43 @@ class Game:
         
         # Draw game over
         if self.game_over:
-            game_over_surf = font_large.render("GAME OVER", True, RED)
+            game_over_surf = render_text(font_large, "GAME OVER", True, RED)
             game_over_rect = game_over_surf.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 50))
             surface.blit(game_over_surf, game_over_rect)
             
-            restart_surf = font_medium.render("Press R to restart", True, WHITE)
+            restart_surf = render_text(font_medium, "Press R to restart", True, WHITE)
             restart_rect = restart_surf.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 50))
             surface.blit(restart_surf, restart_rect)
 
+def random_placement(game):
+    # Baseline driver for headless runs: random rotation and column, then hard drop
+    for _ in range(random.randint(0, 3)):
+        game.current_piece.try_rotate(game.rows)
+    
+    dx = random.randint(-GRID_WIDTH // 2, GRID_WIDTH // 2)
+    for _ in range(abs(dx)):
+        if not game.move(1 if dx > 0 else -1, 0):
+            break
+    game.drop()
+
+def simulate(games=100, policy=random_placement):
+    # Headless games, one policy(game) call per piece: no rendering and no
+    # frame pacing. Returns (score, lines cleared, pieces) per game.
+    results = []
+    for _ in range(games):
+        game = Game()
+        pieces = 0
+        while not game.game_over:
+            policy(game)
+            pieces += 1
+        results.append((game.score, game.lines_cleared, pieces))
+    return results
+
 def draw_menu():
     screen.fill(BLACK)
     
     # Draw title
-    title = font_large.render("RETRO TETRIS", True, WHITE)
+    title = render_text(font_large, "RETRO TETRIS", True, WHITE)
     title_rect = title.get_rect(center=(WIDTH//2, HEIGHT//4))
     screen.blit(title, title_rect)
     
@@ -229,69 +290,138 @@ def draw_menu():
     ]
     
     for i, line in enumerate(instructions):
-        text = font_medium.render(line, True, WHITE)
+        text = render_text(font_medium, line, True, WHITE)
         text_rect = text.get_rect(center=(WIDTH//2, HEIGHT//2 + i * 40))
         screen.blit(text, text_rect)
 
-def main():
-    clock = pygame.time.Clock()
-    game = Game()
+def init_display():
+    global screen
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    return screen
+
+class TetrisScene(Scene):
+    caption = "Retro Tetris"
     
-    game_state = "menu"  # menu, playing, game_over
+    def __init__(self):
+        super().__init__()
+        self.game = Game()
+        
+        self.game_state = "menu"  # menu, playing, game_over
     
-    # Key repeat for movement
-    pygame.key.set_repeat(200, 100)
+    def enter(self, surface):
+        global screen
+        screen = surface
+        super().enter(surface)
+        
+        # Key repeat for movement
+        pygame.key.set_repeat(200, 100)
     
-    running = True
-    while running:
-        dt = clock.tick(60) / 1000.0  # Convert to seconds
+    def handle_event(self, event):
+        if event.type != pygame.KEYDOWN:
+            return
         
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    running = False
-                
-                if game_state == "menu":
-                    if event.key == pygame.K_SPACE:
-                        game_state = "playing"
-                        game = Game()
-                
-                elif game_state == "playing":
-                    if event.key == pygame.K_LEFT:
-                        game.move(-1, 0)
-                    if event.key == pygame.K_RIGHT:
-                        game.move(1, 0)
-                    if event.key == pygame.K_DOWN:
-                        game.move(0, 1)
-                    if event.key == pygame.K_UP:
-                        game.current_piece.try_rotate(game.grid)
-                    if event.key == pygame.K_SPACE:
-                        game.drop()
-                
-                if game.game_over and event.key == pygame.K_r:
-                    game = Game()
-                    game_state = "playing"
+        game = self.game
+        if event.key == pygame.K_ESCAPE:
+            self.running = False
+            # Don't leak key repeat into whatever hosts us next
+            pygame.key.set_repeat()
         
-        screen.fill(BLACK)
+        if self.game_state == "menu":
+            if event.key == pygame.K_SPACE:
+                self.game_state = "playing"
+                self.game = Game()
         
-        if game_state == "menu":
-            draw_menu()
-        elif game_state == "playing":
-            game.update(dt)
-            game.draw(screen)
+        elif self.game_state == "playing":
+            if event.key == pygame.K_LEFT:
+                game.move(-1, 0)
+            if event.key == pygame.K_RIGHT:
+                game.move(1, 0)
+            if event.key == pygame.K_DOWN:
+                game.move(0, 1)
+            if event.key == pygame.K_UP:
+                game.current_piece.try_rotate(game.rows)
+            if event.key == pygame.K_SPACE:
+                game.drop()
+        
+        if self.game.game_over and event.key == pygame.K_r:
+            self.game = Game()
+            self.game_state = "playing"
+    
+    def update(self, dt):
+        if self.game_state == "playing":
+            self.game.update(dt)
             
-            if game.game_over:
-                game_state = "game_over"
-        elif game_state == "game_over":
-            game.draw(screen)
+            if self.game.game_over:
+                self.game_state = "game_over"
+    
+    def draw(self, surface, alpha=1.0):
+        surface.fill(BLACK)
         
-        pygame.display.flip()
+        if self.game_state == "menu":
+            draw_menu()
+        elif self.game_state in ("playing", "game_over"):
+            self.game.draw(surface)
+
+def main():
+    run_scene(TetrisScene(), init_display())
     
     pygame.quit()
     sys.exit()
 
+def run_headless(games):
+    start = time.perf_counter()
+    results = simulate(games)
+    elapsed = time.perf_counter() - start
+    
+    pieces = sum(result[2] for result in results)
+    lines = sum(result[1] for result in results)
+    print(f"{games} games, {lines} lines cleared")
+    print(f"{pieces} pieces in {elapsed:.2f}s ({pieces / elapsed:,.0f} pieces/s)")
+
+def run_benchmark(games):
+    # Piece placement throughput with a fixed seed, so runs are comparable
+    random.seed(1)
+    start = time.perf_counter()
+    results = simulate(games)
+    elapsed = time.perf_counter() - start
+    pieces = sum(result[2] for result in results)
+    print(f"placement: {pieces} pieces in {elapsed:.2f}s ({pieces / elapsed:,.0f} pieces/s)")
+    
+    # Collision checks alone: slide a piece wall to wall over a half-full board
+    random.seed(2)
+    game = Game()
+    for _ in range(12):
+        random_placement(game)
+    moves = 0
+    start = time.perf_counter()
+    for _ in range(20000):
+        while game.move(1, 0):
+            moves += 1
+        while game.move(-1, 0):
+            moves += 1
+        moves += 2  # the blocked move at each wall
+    elapsed = time.perf_counter() - start
+    print(f"collision: {moves} moves in {elapsed:.2f}s ({moves / elapsed:,.0f} moves/s)")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Retro Tetris")
+    parser.add_argument("--headless", action="store_true",
+                        help="simulate games without a window and report speed")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="time piece placement and collision checks")
+    parser.add_argument("--games", type=int, default=100,
+                        help="games to simulate with --headless or --benchmark")
+    add_frame_stats_args(parser)
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.headless:
+        enable_headless()
+        run_headless(args.games)
+    elif args.benchmark:
+        enable_headless()
+        run_benchmark(args.games)
+    else:
+        apply_frame_stats_args(args)
+        main()
@@ -2,14 +2,17 @@ import pygame
 import sys
 import random
 import time
+import argparse
+
+from retro_engine import (Scene, run_scene, render_text, enable_headless,
+                          add_frame_stats_args, apply_frame_stats_args)
 
 # Initialize pygame
 pygame.init()
 
 # Screen dimensions
 WIDTH, HEIGHT = 800, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Retro Tic-Tac-Toe")
+screen = None  # Set by init_display() or by the host running TicTacToeScene
 
 # Colors
 BLACK = (0, 0, 0)
@@ -29,6 +32,12 @@ BOARD_SIZE = 3
 CELL_SIZE = 120
 BOARD_OFFSET_X = (WIDTH - BOARD_SIZE * CELL_SIZE) // 2
 BOARD_OFFSET_Y = (HEIGHT - BOARD_SIZE * CELL_SIZE) // 2
+AI_MOVE_DELAY = 0.5  # seconds, so the AI move is visible
+
+# Menu buttons
+BUTTON_WIDTH = 300
+BUTTON_HEIGHT = 80
+BUTTON_MARGIN = 30
 
 class TicTacToe:
     def __init__(self):
@@ -221,16 +230,16 @@ class TicTacToe:
                     pygame.draw.circle(surface, RED, (x_center, y_center), radius, 8)
         
         # Draw current player indicator
-        player_text = font_medium.render(f"Current Player: {self.current_player}", True, WHITE)
+        player_text = render_text(font_medium, f"Current Player: {self.current_player}", True, WHITE)
         surface.blit(player_text, (20, 20))
         
         # Draw AI status
-        ai_text = font_medium.render(f"AI: {'ON' if self.ai_enabled else 'OFF'}", True, WHITE)
+        ai_text = render_text(font_medium, f"AI: {'ON' if self.ai_enabled else 'OFF'}", True, WHITE)
         surface.blit(ai_text, (WIDTH - 150, 20))
         
         # Draw difficulty if AI is enabled
         if self.ai_enabled:
-            diff_text = font_medium.render(f"Difficulty: {self.difficulty}", True, WHITE)
+            diff_text = render_text(font_medium, f"Difficulty: {self.difficulty}", True, WHITE)
             surface.blit(diff_text, (WIDTH - 250, 60))
         
         # Draw game over message
@@ -246,53 +255,77 @@ class TicTacToe:
                 message = "It's a draw!"
                 color = WHITE
             
-            game_over_text = font_large.render(message, True, color)
+            game_over_text = render_text(font_large, message, True, color)
             game_over_rect = game_over_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 50))
             surface.blit(game_over_text, game_over_rect)
             
-            restart_text = font_medium.render("Press R to restart", True, WHITE)
+            restart_text = render_text(font_medium, "Press R to restart", True, WHITE)
             restart_rect = restart_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 50))
             surface.blit(restart_text, restart_rect)
 
+def simulate(games=100, difficulty="Hard"):
+    # Headless AI-vs-AI games: X plays random moves, O plays at the given
+    # difficulty. No rendering and no delays. Returns win/draw counts.
+    results = {'X': 0, 'O': 0, 'draw': 0}
+    for _ in range(games):
+        game = TicTacToe()
+        game.difficulty = difficulty
+        while not game.game_over:
+            if game.current_player == 'X':
+                game.ai_move_easy()
+            else:
+                game.ai_move()
+        results[game.winner or 'draw'] += 1
+    return results
+
+def menu_button_rects():
+    ai_button = pygame.Rect(WIDTH//2 - BUTTON_WIDTH//2, HEIGHT//2, BUTTON_WIDTH, BUTTON_HEIGHT)
+    human_button = pygame.Rect(WIDTH//2 - BUTTON_WIDTH//2, HEIGHT//2 + BUTTON_HEIGHT + BUTTON_MARGIN, 
+                              BUTTON_WIDTH, BUTTON_HEIGHT)
+    back_button = pygame.Rect(WIDTH//2 - BUTTON_WIDTH//2, HEIGHT//2 + 2*(BUTTON_HEIGHT + BUTTON_MARGIN), 
+                             BUTTON_WIDTH, BUTTON_HEIGHT)
+    return ai_button, human_button, back_button
+
+def difficulty_button_rects():
+    easy_button = pygame.Rect(WIDTH//2 - BUTTON_WIDTH//2, HEIGHT//2 - BUTTON_HEIGHT - BUTTON_MARGIN, 
+                             BUTTON_WIDTH, BUTTON_HEIGHT)
+    medium_button = pygame.Rect(WIDTH//2 - BUTTON_WIDTH//2, HEIGHT//2, BUTTON_WIDTH, BUTTON_HEIGHT)
+    hard_button = pygame.Rect(WIDTH//2 - BUTTON_WIDTH//2, HEIGHT//2 + BUTTON_HEIGHT + BUTTON_MARGIN, 
+                             BUTTON_WIDTH, BUTTON_HEIGHT)
+    return easy_button, medium_button, hard_button
+
 def draw_menu():
     screen.fill(BLACK)
     
     # Draw title
-    title = font_large.render("RETRO TIC-TAC-TOE", True, WHITE)
+    title = render_text(font_large, "RETRO TIC-TAC-TOE", True, WHITE)
     title_rect = title.get_rect(center=(WIDTH//2, HEIGHT//4))
     screen.blit(title, title_rect)
     
     # Draw buttons
-    button_width = 300
-    button_height = 80
-    button_margin = 30
+    ai_button, human_button, back_button = menu_button_rects()
     
     # Play vs AI button
-    ai_button = pygame.Rect(WIDTH//2 - button_width//2, HEIGHT//2, button_width, button_height)
     pygame.draw.rect(screen, BLUE, ai_button, border_radius=15)
     pygame.draw.rect(screen, BLACK, ai_button, 3, border_radius=15)
     
-    ai_text = font_medium.render("PLAY VS AI", True, WHITE)
+    ai_text = render_text(font_medium, "PLAY VS AI", True, WHITE)
     ai_text_rect = ai_text.get_rect(center=ai_button.center)
     screen.blit(ai_text, ai_text_rect)
     
     # Play vs Human button
-    human_button = pygame.Rect(WIDTH//2 - button_width//2, HEIGHT//2 + button_height + button_margin, 
-                              button_width, button_height)
     pygame.draw.rect(screen, RED, human_button, border_radius=15)
     pygame.draw.rect(screen, BLACK, human_button, 3, border_radius=15)
     
-    human_text = font_medium.render("PLAY VS HUMAN", True, WHITE)
+    human_text = render_text(font_medium, "PLAY VS HUMAN", True, WHITE)
     human_text_rect = human_text.get_rect(center=human_button.center)
     screen.blit(human_text, human_text_rect)
     
     # Back button
-    back_button = pygame.Rect(WIDTH//2 - button_width//2, HEIGHT//2 + 2*(button_height + button_margin), 
-                             button_width, button_height)
     pygame.draw.rect(screen, GRAY, back_button, border_radius=15)
     pygame.draw.rect(screen, BLACK, back_button, 3, border_radius=15)
     
-    back_text = font_medium.render("BACK", True, BLACK)
+    back_text = render_text(font_medium, "BACK", True, BLACK)
     back_text_rect = back_text.get_rect(center=back_button.center)
     screen.blit(back_text, back_text_rect)
     
@@ -302,137 +335,168 @@ def draw_difficulty_menu():
     screen.fill(BLACK)
     
     # Draw title
-    title = font_large.render("SELECT DIFFICULTY", True, WHITE)
+    title = render_text(font_large, "SELECT DIFFICULTY", True, WHITE)
     title_rect = title.get_rect(center=(WIDTH//2, HEIGHT//4))
     screen.blit(title, title_rect)
     
     # Draw buttons
-    button_width = 300
-    button_height = 80
-    button_margin = 30
+    easy_button, medium_button, hard_button = difficulty_button_rects()
     
     # Easy button
-    easy_button = pygame.Rect(WIDTH//2 - button_width//2, HEIGHT//2 - button_height - button_margin, 
-                             button_width, button_height)
     pygame.draw.rect(screen, GREEN, easy_button, border_radius=15)
     pygame.draw.rect(screen, BLACK, easy_button, 3, border_radius=15)
     
-    easy_text = font_medium.render("EASY", True, BLACK)
+    easy_text = render_text(font_medium, "EASY", True, BLACK)
     easy_text_rect = easy_text.get_rect(center=easy_button.center)
     screen.blit(easy_text, easy_text_rect)
     
     # Medium button
-    medium_button = pygame.Rect(WIDTH//2 - button_width//2, HEIGHT//2, button_width, button_height)
     pygame.draw.rect(screen, BLUE, medium_button, border_radius=15)
     pygame.draw.rect(screen, BLACK, medium_button, 3, border_radius=15)
     
-    medium_text = font_medium.render("MEDIUM", True, WHITE)
+    medium_text = render_text(font_medium, "MEDIUM", True, WHITE)
     medium_text_rect = medium_text.get_rect(center=medium_button.center)
     screen.blit(medium_text, medium_text_rect)
     
     # Hard button
-    hard_button = pygame.Rect(WIDTH//2 - button_width//2, HEIGHT//2 + button_height + button_margin, 
-                             button_width, button_height)
     pygame.draw.rect(screen, RED, hard_button, border_radius=15)
     pygame.draw.rect(screen, BLACK, hard_button, 3, border_radius=15)
     
-    hard_text = font_medium.render("HARD", True, WHITE)
+    hard_text = render_text(font_medium, "HARD", True, WHITE)
     hard_text_rect = hard_text.get_rect(center=hard_button.center)
     screen.blit(hard_text, hard_text_rect)
     
     return easy_button, medium_button, hard_button
 
-def main():
-    clock = pygame.time.Clock()
-    game = TicTacToe()
+def init_display():
+    global screen
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    return screen
+
+class TicTacToeScene(Scene):
+    caption = "Retro Tic-Tac-Toe"
+    
+    def __init__(self):
+        super().__init__()
+        self.game = TicTacToe()
+        self.ai_timer = 0
+        
+        self.game_state = "menu"  # menu, difficulty, playing
+    
+    def enter(self, surface):
+        global screen
+        screen = surface
+        super().enter(surface)
     
-    game_state = "menu"  # menu, difficulty, playing
+    def start_game(self, ai_enabled, difficulty=None):
+        game = self.game
+        game.reset()
+        game.ai_enabled = ai_enabled
+        if difficulty:
+            game.difficulty = difficulty
+        self.ai_timer = 0
+        self.game_state = "playing"
     
-    running = True
-    while running:
-        mouse_pos = pygame.mouse.get_pos()
-        mouse_click = False
+    def handle_event(self, event):
+        game = self.game
         
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                if self.game_state == "playing":
+                    self.game_state = "menu"
+                else:
+                    self.running = False
             
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:  # Left mouse button
-                    mouse_click = True
-            
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    if game_state == "playing":
-                        game_state = "menu"
-                    else:
-                        running = False
-                
-                if event.key == pygame.K_r and game.game_over:
-                    game.reset()
+            if event.key == pygame.K_r and game.game_over and self.game_state == "playing":
+                # Same mode and difficulty again; only the menu changes them
+                self.start_game(game.ai_enabled, game.difficulty)
         
-        screen.fill(BLACK)
+        if event.type != pygame.MOUSEBUTTONDOWN or event.button != 1:  # Left mouse button
+            return
+        mouse_pos = event.pos
         
-        if game_state == "menu":
-            ai_button, human_button, back_button = draw_menu()
+        if self.game_state == "menu":
+            ai_button, human_button, back_button = menu_button_rects()
             
-            if mouse_click:
-                if ai_button.collidepoint(mouse_pos):
-                    game_state = "difficulty"
-                elif human_button.collidepoint(mouse_pos):
-                    game.ai_enabled = False
-                    game.reset()
-                    game_state = "playing"
-                elif back_button.collidepoint(mouse_pos):
-                    running = False
+            if ai_button.collidepoint(mouse_pos):
+                self.game_state = "difficulty"
+            elif human_button.collidepoint(mouse_pos):
+                self.start_game(ai_enabled=False)
+            elif back_button.collidepoint(mouse_pos):
+                self.running = False
         
-        elif game_state == "difficulty":
-            easy_button, medium_button, hard_button = draw_difficulty_menu()
+        elif self.game_state == "difficulty":
+            easy_button, medium_button, hard_button = difficulty_button_rects()
             
-            if mouse_click:
-                if easy_button.collidepoint(mouse_pos):
-                    game.difficulty = "Easy"
-                    game.ai_enabled = True
-                    game.reset()
-                    game.difficulty = "Easy"  # Set again after reset to ensure it sticks
-                    game_state = "playing"
-                elif medium_button.collidepoint(mouse_pos):
-                    game.difficulty = "Medium"
-                    game.ai_enabled = True
-                    game.reset()
-                    game.difficulty = "Medium"  # Set again after reset to ensure it sticks
-                    game_state = "playing"
-                elif hard_button.collidepoint(mouse_pos):
-                    game.difficulty = "Hard"
-                    game.ai_enabled = True
-                    game.reset()
-                    game.difficulty = "Hard"  # Set again after reset to ensure it sticks
-                    game_state = "playing"
+            if easy_button.collidepoint(mouse_pos):
+                self.start_game(ai_enabled=True, difficulty="Easy")
+            elif medium_button.collidepoint(mouse_pos):
+                self.start_game(ai_enabled=True, difficulty="Medium")
+            elif hard_button.collidepoint(mouse_pos):
+                self.start_game(ai_enabled=True, difficulty="Hard")
         
-        elif game_state == "playing":
-            game.draw(screen)
-            
+        elif self.game_state == "playing":
             # Handle player moves
             if not game.game_over and game.current_player == 'X':  # Human is always X
-                if mouse_click:
-                    # Convert mouse position to board position
-                    if BOARD_OFFSET_X <= mouse_pos[0] <= BOARD_OFFSET_X + BOARD_SIZE * CELL_SIZE and \
-                       BOARD_OFFSET_Y <= mouse_pos[1] <= BOARD_OFFSET_Y + BOARD_SIZE * CELL_SIZE:
-                        col = (mouse_pos[0] - BOARD_OFFSET_X) // CELL_SIZE
-                        row = (mouse_pos[1] - BOARD_OFFSET_Y) // CELL_SIZE
-                        game.make_move(row, col)
-            
-            # Handle AI moves
-            if not game.game_over and game.current_player == 'O' and game.ai_enabled:
-                # Add a small delay to make AI move visible
-                pygame.display.flip()
-                time.sleep(0.5)
+                # Convert mouse position to board position
+                if BOARD_OFFSET_X <= mouse_pos[0] <= BOARD_OFFSET_X + BOARD_SIZE * CELL_SIZE and \
+                   BOARD_OFFSET_Y <= mouse_pos[1] <= BOARD_OFFSET_Y + BOARD_SIZE * CELL_SIZE:
+                    col = (mouse_pos[0] - BOARD_OFFSET_X) // CELL_SIZE
+                    row = (mouse_pos[1] - BOARD_OFFSET_Y) // CELL_SIZE
+                    game.make_move(row, col)
+    
+    def update(self, dt):
+        game = self.game
+        
+        # Handle AI moves, after a small delay to make them visible
+        if self.game_state == "playing" and not game.game_over and game.current_player == 'O' and game.ai_enabled:
+            self.ai_timer += dt
+            if self.ai_timer >= AI_MOVE_DELAY:
+                self.ai_timer = 0
                 game.ai_move()
+        else:
+            self.ai_timer = 0
+    
+    def draw(self, surface, alpha=1.0):
+        surface.fill(BLACK)
         
-        pygame.display.flip()
-        clock.tick(60)
+        if self.game_state == "menu":
+            draw_menu()
+        elif self.game_state == "difficulty":
+            draw_difficulty_menu()
+        elif self.game_state == "playing":
+            self.game.draw(surface)
+
+def main():
+    run_scene(TicTacToeScene(), init_display())
     
     pygame.quit()
     sys.exit()
+
+def run_headless(games, difficulty):
+    start = time.perf_counter()
+    results = simulate(games, difficulty)
+    elapsed = time.perf_counter() - start
+    
+    print(f"{games} games vs {difficulty} AI: X {results['X']}, O {results['O']}, draw {results['draw']}")
+    print(f"{elapsed:.2f}s ({games / elapsed:,.0f} games/s)")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Retro Tic-Tac-Toe")
+    parser.add_argument("--headless", action="store_true",
+                        help="simulate AI-vs-AI games without a window and report speed")
+    parser.add_argument("--games", type=int, default=100,
+                        help="games to simulate with --headless")
+    parser.add_argument("--difficulty", choices=["Easy", "Medium", "Hard"], default="Hard",
+                        help="difficulty of the O player with --headless")
+    add_frame_stats_args(parser)
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.headless:
+        enable_headless()
+        run_headless(args.games, args.difficulty)
+    else:
+        apply_frame_stats_args(args)
+        main()